@@ -0,0 +1,79 @@
+# adaptive_wait.py
+import threading
+import time
+from collections import deque
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Recent wait latencies (seconds) per page type, used to size later timeouts
+_latencies = {}
+_latencies_lock = threading.Lock()
+MAX_SAMPLES = 200
+MIN_SAMPLES = 5 # Below this, the full max_timeout is used
+
+
+def element_present(selector):
+    """Condition: returns the first element matching `selector`, or False."""
+    def condition(driver):
+        elements = driver.find_elements(By.CSS_SELECTOR, selector)
+        return elements[0] if elements else False
+    return condition
+
+def element_with_text(selector):
+    """Condition: returns the first element matching `selector` whose text is non-empty, or False."""
+    def condition(driver):
+        for element in driver.find_elements(By.CSS_SELECTOR, selector):
+            if element.text.strip():
+                return element
+        return False
+    return condition
+
+def element_clickable(selector):
+    """Condition: returns the first displayed and enabled element matching `selector`, or False."""
+    def condition(driver):
+        for element in driver.find_elements(By.CSS_SELECTOR, selector):
+            if element.is_displayed() and element.is_enabled():
+                return element
+        return False
+    return condition
+
+def _percentile(samples, percent):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(percent / 100.0 * (len(ordered) - 1))))]
+
+def record_latency(page_type, seconds):
+    with _latencies_lock:
+        _latencies.setdefault(page_type, deque(maxlen=MAX_SAMPLES)).append(seconds)
+
+def get_latency_percentiles():
+    """Returns {page_type: {"count", "p50", "p95"}} for the waits recorded so far."""
+    with _latencies_lock:
+        return {page_type: {"count": len(samples), "p50": _percentile(samples, 50), "p95": _percentile(samples, 95)}
+                for page_type, samples in _latencies.items() if samples}
+
+def adaptive_timeout(page_type, min_timeout=3, max_timeout=20, factor=3):
+    """A timeout of `factor` x the p95 latency seen for this page type, clamped to [min, max]."""
+    with _latencies_lock:
+        samples = list(_latencies.get(page_type, ()))
+    if len(samples) < MIN_SAMPLES:
+        return max_timeout
+    return max(min_timeout, min(max_timeout, _percentile(samples, 95) * factor))
+
+def wait_for(driver, condition, page_type, timeout=None, poll_interval=0.1, min_timeout=3, max_timeout=20):
+    """
+    Polls `condition(driver)` every `poll_interval` seconds and returns its first
+    truthy result. The time taken is recorded for `page_type` (a timeout is recorded
+    too, so slow loads raise later timeouts); without an explicit timeout, one is
+    derived from that page type's latency history. Raises TimeoutException like WebDriverWait.
+    """
+    if timeout is None:
+        timeout = adaptive_timeout(page_type, min_timeout, max_timeout)
+    start = time.monotonic()
+    try:
+        # React may re-render a matched element between find and .text/.is_displayed(); just poll again
+        return WebDriverWait(driver, timeout, poll_frequency=poll_interval,
+                             ignored_exceptions=(StaleElementReferenceException,)).until(condition)
+    finally:
+        record_latency(page_type, time.monotonic() - start)
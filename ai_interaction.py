@@ -1,68 +1,259 @@
 # ai_interaction.py
 import google.generativeai as genai
+import json
+import random
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+try:
+    from google.api_core import exceptions as google_exceptions # Installed with google-generativeai
+    _RETRYABLE_API_ERRORS = (google_exceptions.TooManyRequests, google_exceptions.ResourceExhausted,
+                             google_exceptions.ServiceUnavailable, google_exceptions.InternalServerError,
+                             google_exceptions.DeadlineExceeded, google_exceptions.GatewayTimeout,
+                             google_exceptions.Aborted)
+    _FATAL_API_ERRORS = (google_exceptions.InvalidArgument, google_exceptions.PermissionDenied,
+                         google_exceptions.Unauthenticated, google_exceptions.NotFound,
+                         google_exceptions.FailedPrecondition)
+except ImportError:
+    google_exceptions = None
+
+import metrics
+from llm_cache import make_cache_key
+from rate_limit import TokenBucket
+from resume_parser import build_resume_context
+
+_rate_limiter = None # Shared across all threads calling Gemini; see configure_rate_limit()
+_response_cache = None # Optional ResponseCache; see configure_response_cache()
+
+# Bump a version whenever its prompt template changes so cached responses are not reused
+RESUME_PROMPT_VERSION = 1
+COVER_LETTER_PROMPT_VERSION = 1
+BATCH_PROMPT_VERSION = 1
+
+SAFETY_SETTINGS = [ # Adjust safety settings if needed
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+]
+
+# Named model profiles. Each is built once by get_model() and reused for every call.
+MODEL_PROFILES = {
+    "default": {
+        "model_name": "gemini-pro", # Use gemini-pro (free tier eligible)
+        "generation_config": {
+            "temperature": 0.7, # Controls randomness - lower is more predictable
+            "top_p": 1,
+            "top_k": 1,
+            "max_output_tokens": 1024, # Adjust as needed
+        },
+    },
+    "resume": {
+        "model_name": "gemini-pro",
+        "generation_config": {"temperature": 0.4, "top_p": 1, "top_k": 1, "max_output_tokens": 1024}, # Stick close to the base resume
+    },
+    "cover_letter": {
+        "model_name": "gemini-pro",
+        "generation_config": {"temperature": 0.8, "top_p": 1, "top_k": 1, "max_output_tokens": 1536}, # Longer, freer prose
+    },
+    "batch": {
+        "model_name": "gemini-pro",
+        # Several jobs' documents in one JSON reply. gemini-pro has no JSON mode (response_mime_type is
+        # rejected), so the prompt asks for JSON and _parse_batch_response() strips any code fences.
+        # 2048 is gemini-pro's output limit; larger values are silently capped.
+        "generation_config": {"temperature": 0.6, "top_p": 1, "top_k": 1, "max_output_tokens": 2048},
+    },
+}
+BATCH_TOKENS_PER_JOB = 1000 # Rough output of one job's bullet points plus a 3-4 paragraph letter, JSON-escaped
+# Jobs per batch request that fit the output budget; bigger batches would be cut off mid-reply
+MAX_BATCH_JOBS = max(1, MODEL_PROFILES["batch"]["generation_config"]["max_output_tokens"] // BATCH_TOKENS_PER_JOB)
+
+_models = {}
+_models_lock = threading.Lock()
+_timing_lock = threading.Lock()
+_model_timings = {"models_created": 0, "setup_seconds": 0.0, "calls": 0, "inference_seconds": 0.0}
 
 def configure_gemini(api_key):
     """Configures the Google Gemini API client."""
     try:
         genai.configure(api_key=api_key)
+        with _models_lock:
+            _models.clear() # Models built before (re)configuring would use the old client settings
         print("Gemini API configured successfully.")
     except Exception as e:
         print(f"Error configuring Gemini API: {e}")
         raise
 
-def get_gemini_response(prompt, retries=3, delay=5):
-    """Gets response from Gemini model with basic retry logic."""
+def configure_rate_limit(requests_per_minute):
+    """Limits Gemini calls from every thread to `requests_per_minute` (<= 0 disables limiting)."""
+    global _rate_limiter
+    rate = requests_per_minute / 60.0
+    _rate_limiter = TokenBucket(rate, capacity=max(1.0, requests_per_minute / 10.0)) if rate > 0 else None
+
+def configure_response_cache(cache):
+    """Sets the ResponseCache used by the generate_* functions (None disables caching)."""
+    global _response_cache
+    _response_cache = cache
+
+def _generate_with_cache(prompt, profile, cache_key_parts):
+    """Returns a cached response for identical inputs, otherwise calls Gemini and caches success."""
+    if _response_cache is None:
+        return get_gemini_response(prompt, profile=profile)
+
+    cache_key = make_cache_key(MODEL_PROFILES[profile], *cache_key_parts)
+    cached_response = _response_cache.get(cache_key)
+    if cached_response is not None:
+        print("--- Gemini Response Served From Cache ---")
+        return GeminiResult(ok=True, text=cached_response, cached=True)
+
+    result = get_gemini_response(prompt, profile=profile)
+    if result.ok:
+        _response_cache.put(cache_key, result.text)
+    return result
+
+def get_model(profile="default"):
+    """Returns the GenerativeModel for a profile in MODEL_PROFILES, creating it on first use."""
+    model = _models.get(profile)
+    if model is not None:
+        return model
+    with _models_lock:
+        if profile not in _models:
+            settings = MODEL_PROFILES[profile]
+            start = time.perf_counter()
+            _models[profile] = genai.GenerativeModel(model_name=settings["model_name"],
+                                                     generation_config=settings["generation_config"],
+                                                     safety_settings=settings.get("safety_settings", SAFETY_SETTINGS))
+            with _timing_lock:
+                _model_timings["models_created"] += 1
+                _model_timings["setup_seconds"] += time.perf_counter() - start
+        return _models[profile]
+
+def get_model_timing_stats():
+    """Returns how much time went to model setup versus inference so far."""
+    with _timing_lock:
+        return dict(_model_timings)
+
+@dataclass
+class GeminiResult:
+    """Outcome of a Gemini request. `text` is only meaningful when `ok` is True."""
+    ok: bool
+    text: str = ""
+    error: str = ""
+    retryable: bool = False
+    attempts: int = 0
+    cached: bool = False
+
+def _retry_hint_seconds(error):
+    """Reads a server-suggested retry delay from a rate-limit error, if it has one."""
+    retry_delay = getattr(error, "retry_delay", None) # Some client versions expose it directly
+    if hasattr(retry_delay, "total_seconds"):
+        return retry_delay.total_seconds()
+    if isinstance(retry_delay, (int, float)):
+        return float(retry_delay)
+    match = re.search(r"retry_delay\s*\{\s*seconds:\s*(\d+)", str(error)) or \
+        re.search(r"retry (?:in|after) ([\d.]+)\s*s", str(error), re.IGNORECASE)
+    return float(match.group(1)) if match else None
+
+def _is_retryable_error(error):
+    """Transient errors (quota, overload, timeouts, network) are worth retrying; request errors are not."""
+    if google_exceptions is not None:
+        if isinstance(error, _RETRYABLE_API_ERRORS):
+            return True
+        if isinstance(error, _FATAL_API_ERRORS):
+            return False
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    if isinstance(error, (ValueError, TypeError, KeyError)):
+        return False
+    message = str(error).lower()
+    return "429" in message or "quota" in message or "unavailable" in message or "timeout" in message
+
+def _backoff_delay(attempt, base_delay, max_delay, hint=None):
+    """Exponential backoff with full jitter, never shorter than the server's hint."""
+    delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+    if hint is not None:
+        delay = max(delay, hint + random.uniform(0, base_delay))
+    return delay
+
+def _count_tokens(prompt, response):
+    """Adds a call's token usage to the run metrics (estimated at ~4 chars/token if the API doesn't report it)."""
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+    metrics.incr("gemini_prompt_tokens", prompt_tokens if prompt_tokens is not None else len(prompt) // 4)
+    metrics.incr("gemini_output_tokens", getattr(usage, "candidates_token_count", None) or 0)
+
+def get_gemini_response(prompt, profile="default", retries=5, base_delay=2, max_delay=60):
+    """
+    Gets a response from the Gemini model of a profile. Retryable failures are
+    retried with exponential backoff and jitter (honoring server retry hints);
+    fatal ones return immediately. Returns a GeminiResult.
+    """
     print("\n--- Sending Prompt to Gemini ---")
     # print(f"Prompt: {prompt[:200]}...") # Print start of prompt for debugging
-    
-    
-    
 
+    result = GeminiResult(ok=False, error="No attempts made.")
     for attempt in range(retries):
+        hint = None
         try:
-            model = genai.GenerativeModel(model_name="gemini-pro", # Use gemini-pro (free tier eligible)
-                                          generation_config = {
-                                            "temperature": 0.7, # Controls randomness - lower is more predictable
-                                            "top_p": 1,
-                                            "top_k": 1,
-                                            "max_output_tokens": 1024, # Adjust as needed
-                                            },
-                                          safety_settings = [ # Adjust safety settings if needed
-                                            {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-                                            {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-                                            {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-                                            {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-                                        ])
-            response = model.generate_content(prompt)
-            
+            if _rate_limiter:
+                _rate_limiter.acquire()
+            model = get_model(profile)
+            start = time.perf_counter()
+            try:
+                response = model.generate_content(prompt)
+            finally:
+                elapsed = time.perf_counter() - start
+                metrics.record_time(f"gemini:{profile}", elapsed)
+                with _timing_lock:
+                    _model_timings["calls"] += 1
+                    _model_timings["inference_seconds"] += elapsed
+            _count_tokens(prompt, response)
+
             # Check if response has text before returning
             if response.parts:
-                 print("--- Gemini Response Received ---")
-                 return response.text
-            else:
-                 # Handle cases where the response might be blocked or empty
-                 print(f"Warning: Gemini response was empty or blocked. Reason: {response.prompt_feedback}")
-                 # If blocked for safety, it won't succeed on retry with same prompt.
-                 # If potentially transient issue, retry might help.
-                 if response.prompt_feedback and response.prompt_feedback.block_reason:
-                    return f"Error: Content blocked by safety settings ({response.prompt_feedback.block_reason}). Please adjust prompt or safety settings."
-                 # If empty for other reasons, retry.
+                print("--- Gemini Response Received ---")
+                return GeminiResult(ok=True, text=response.text, attempts=attempt + 1)
+
+            # Handle cases where the response might be blocked or empty
+            print(f"Warning: Gemini response was empty or blocked. Reason: {response.prompt_feedback}")
+            if response.prompt_feedback and response.prompt_feedback.block_reason:
+                # Blocked for safety; the same prompt will not succeed on retry
+                return GeminiResult(ok=False, attempts=attempt + 1,
+                                    error=f"Content blocked by safety settings ({response.prompt_feedback.block_reason}). "
+                                          "Please adjust prompt or safety settings.")
+            # Empty for other reasons; usually transient
+            result = GeminiResult(ok=False, error="Empty response from Gemini.", retryable=True, attempts=attempt + 1)
 
         except Exception as e:
-            print(f"Error calling Gemini API (Attempt {attempt + 1}/{retries}): {e}")
-            if attempt < retries - 1:
-                print(f"Retrying in {delay} seconds...")
-                time.sleep(delay)
-            else:
-                print("Max retries reached. Failed to get response from Gemini.")
-                return f"Error: Failed to get response after {retries} attempts. Last error: {e}"
-                
-    return "Error: Failed to get response after multiple retries (potential non-exception issue)."
+            retryable = _is_retryable_error(e)
+            print(f"Error calling Gemini API (Attempt {attempt + 1}/{retries}, {'retryable' if retryable else 'fatal'}): {e}")
+            result = GeminiResult(ok=False, error=str(e), retryable=retryable, attempts=attempt + 1)
+            if not retryable:
+                return result
+            hint = _retry_hint_seconds(e)
+
+        if attempt < retries - 1:
+            metrics.incr("gemini_retries")
+            delay = _backoff_delay(attempt, base_delay, max_delay, hint)
+            print(f"Retrying in {delay:.1f} seconds...")
+            time.sleep(delay)
 
+    print("Max retries reached. Failed to get response from Gemini.")
+    return result
+
+
+def _resume_context(base_resume_info, job_description):
+    """Parsed resume sections are reduced to the parts relevant to the job; plain text is used as is."""
+    if isinstance(base_resume_info, dict):
+        return build_resume_context(base_resume_info, job_description)
+    return base_resume_info
 
 def generate_resume_content(job_description, base_resume_info):
     """Generates tailored resume content using Gemini."""
+    base_resume_info = _resume_context(base_resume_info, job_description)
     prompt = f"""
     Analyze the following job description and my base resume information.
     Generate 3 concise, impactful project which includes 2-3 bullet points for each project for a resume's project section,
@@ -80,10 +271,12 @@ def generate_resume_content(job_description, base_resume_info):
 
     --- Tailored Resume Bullet Points ---
     """
-    return get_gemini_response(prompt)
+    return _generate_with_cache(prompt, "resume",
+                                ("resume", RESUME_PROMPT_VERSION, job_description, base_resume_info))
 
 def generate_cover_letter(job_description, base_resume_info, company_name, role_title):
     """Generates a tailored cover letter using Gemini."""
+    base_resume_info = _resume_context(base_resume_info, job_description)
     prompt = f"""
     Write a professional and enthusiastic cover letter for the position of {role_title} at {company_name}.
     Use the provided job description and my base resume information to tailor the letter.
@@ -100,4 +293,241 @@ def generate_cover_letter(job_description, base_resume_info, company_name, role_
 
     --- Cover Letter ---
     """
-    return get_gemini_response(prompt)
\ No newline at end of file
+    return _generate_with_cache(prompt, "cover_letter",
+                                ("cover_letter", COVER_LETTER_PROMPT_VERSION, job_description, base_resume_info,
+                                 company_name, role_title))
+
+
+def _build_batch_prompt(batch, base_resume_info):
+    jobs_text = "\n\n".join(
+        f"""=== Job {index} ===
+    Role: {job['title']}
+    Company: {job['company']}
+    --- Job Description ---
+    {job_description}"""
+        for index, (job, job_description) in enumerate(batch)
+    )
+    return f"""
+    You will tailor application documents for {len(batch)} jobs using my base resume information.
+    For EACH job:
+    - "resume_bullet_points": 3 concise, impactful projects with 2-3 bullet points each for a resume's project section,
+      tailored to highlight how my skills and experience match the job. Update the skills according to the keywords in the
+      job description to make it ATS friendly. Quantify results where possible based on the base info. Do NOT invent
+      experience I don't have. Each bullet point starts with '* '.
+    - "cover_letter": a professional and enthusiastic cover letter of 3-4 paragraphs, addressed "Dear Hiring Manager,",
+      highlighting 2-3 qualifications from my base info that match the job. Only the letter text.
+
+    Respond with JSON only, in this form:
+    {{"jobs": [{{"job_index": 0, "resume_bullet_points": "...", "cover_letter": "..."}}, ...]}}
+
+    --- My Base Resume Info ---
+    {base_resume_info}
+
+    --- Jobs ---
+    {jobs_text}
+    """
+
+def _complete_array_items(text):
+    """Returns the complete values of the first JSON array in `text`, stopping at one that is cut off."""
+    decoder = json.JSONDecoder()
+    position = text.find("[")
+    items = []
+    if position < 0:
+        return items
+    position += 1
+    while True:
+        while position < len(text) and text[position] in " \t\r\n,":
+            position += 1
+        if position >= len(text) or text[position] == "]":
+            return items
+        try:
+            item, position = decoder.raw_decode(text, position)
+        except ValueError:
+            return items
+        items.append(item)
+
+def _parse_batch_response(text, batch_size):
+    """
+    Returns {job_index: (resume_text, cover_letter_text)} for every well-formed entry in a batch
+    reply. A reply cut off by the output limit still yields the entries that were completed.
+    """
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.find("\n") + 1:] if "\n" in text else text # Drop a ```json fence label
+    try:
+        data = json.loads(text)
+        entries = data.get("jobs", []) if isinstance(data, dict) else data
+    except ValueError:
+        entries = _complete_array_items(text)
+    parsed = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        index = entry.get("job_index")
+        resume_text = entry.get("resume_bullet_points")
+        cover_letter_text = entry.get("cover_letter")
+        if (isinstance(index, int) and 0 <= index < batch_size
+                and isinstance(resume_text, str) and resume_text.strip()
+                and isinstance(cover_letter_text, str) and cover_letter_text.strip()):
+            parsed[index] = (resume_text.strip(), cover_letter_text.strip())
+    return parsed
+
+def _batch_cache_keys(job, job_description, full_resume_info):
+    settings = MODEL_PROFILES["batch"]
+    return (make_cache_key(settings, "batch_resume", BATCH_PROMPT_VERSION, job_description, full_resume_info),
+            make_cache_key(settings, "batch_cover_letter", BATCH_PROMPT_VERSION, job_description, full_resume_info,
+                           job['company'], job['title']))
+
+def generate_documents_batch(batch, base_resume_info, max_failures=2):
+    """
+    Generates resume bullet points and cover letters for several (job, job_description)
+    pairs, at most MAX_BATCH_JOBS per Gemini request; the base resume is sent once per
+    request. Only jobs whose part of the reply is missing or malformed are sent again,
+    and a request that yields nothing is halved. Jobs left over (or everything after
+    `max_failures` failed requests) go through the per-job prompts. Returns a list of
+    (resume_result, cover_letter_result) in batch order.
+    """
+    results = [None] * len(batch)
+    full_resume_info = base_resume_info # Per-job fallbacks select their own sections
+    base_resume_info = _resume_context(base_resume_info, "\n".join(description for _, description in batch))
+
+    # Serve jobs answered by earlier runs from the cache
+    pending = []
+    for index, (job, job_description) in enumerate(batch):
+        if _response_cache is not None:
+            resume_key, cover_key = _batch_cache_keys(job, job_description, full_resume_info)
+            resume_text, cover_letter_text = _response_cache.get(resume_key), _response_cache.get(cover_key)
+            if resume_text is not None and cover_letter_text is not None:
+                results[index] = (GeminiResult(ok=True, text=resume_text, cached=True),
+                                  GeminiResult(ok=True, text=cover_letter_text, cached=True))
+                continue
+        pending.append(index)
+
+    request_size = MAX_BATCH_JOBS
+    failures = 0
+    while len(pending) > 1 and request_size > 1: # A single job is cheaper through the regular prompts
+        sent = pending[:request_size]
+        sub_batch = [batch[i] for i in sent]
+        response = get_gemini_response(_build_batch_prompt(sub_batch, base_resume_info), profile="batch")
+        if not response.ok:
+            failures += 1
+            if not response.retryable or failures >= max_failures:
+                break
+            continue
+        parsed = _parse_batch_response(response.text, len(sub_batch))
+        print(f"Batch request: parsed {len(parsed)}/{len(sub_batch)} jobs.")
+        if not parsed:
+            request_size //= 2 # Probably cut off; resending the same batch would fail the same way
+            continue
+        unparsed = []
+        for position, index in enumerate(sent):
+            if position not in parsed:
+                unparsed.append(index)
+                continue
+            resume_text, cover_letter_text = parsed[position]
+            results[index] = (GeminiResult(ok=True, text=resume_text, attempts=response.attempts),
+                              GeminiResult(ok=True, text=cover_letter_text, attempts=response.attempts))
+            if _response_cache is not None:
+                job, job_description = batch[index]
+                resume_key, cover_key = _batch_cache_keys(job, job_description, full_resume_info)
+                _response_cache.put(resume_key, resume_text)
+                _response_cache.put(cover_key, cover_letter_text)
+        pending = unparsed + pending[len(sent):]
+
+    # Whatever is left falls back to the per-job prompts
+    for index in pending:
+        job, job_description = batch[index]
+        results[index] = (generate_resume_content(job_description, full_resume_info),
+                          generate_cover_letter(job_description, full_resume_info, job['company'], job['title']))
+    return results
+
+
+class GenerationPool:
+    """
+    Generates the resume bullet points and cover letter for many jobs at once on
+    a thread pool of `max_concurrency` workers. Both prompts of a job run in
+    parallel, and `on_done(job, resume_result, cover_letter_result)` is called
+    with the GeminiResults as soon as a job finishes. At most `max_pending` jobs
+    are in progress; submit() blocks beyond that, so a slow API pushes back on the caller.
+    With `batch_size` > 1, jobs are grouped and sent through generate_documents_batch().
+    """
+
+    def __init__(self, base_resume_info, max_concurrency=4, batch_size=1, max_pending=None):
+        self.base_resume_info = base_resume_info
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_JOBS))
+        self._pending_batch = []
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="gemini")
+        self._slots = threading.BoundedSemaphore(max_pending or max(2 * max_concurrency, 2 * self.batch_size))
+        self._outstanding = 0
+        self._lock = threading.Lock()
+        self._all_done = threading.Condition(self._lock)
+
+    def submit(self, job, job_description, on_done):
+        """Queues both prompts for a job; blocks while `max_pending` jobs are already in progress."""
+        self._slots.acquire()
+        with self._lock:
+            self._outstanding += 1
+            if self.batch_size > 1:
+                self._pending_batch.append((job, job_description, on_done))
+                if len(self._pending_batch) >= self.batch_size:
+                    self._submit_batch()
+                return
+        parts = {}
+        parts_lock = threading.Lock()
+
+        def part_done(name, future):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = GeminiResult(ok=False, error=f"Generation failed: {e}")
+            with parts_lock:
+                parts[name] = result
+                finished = len(parts) == 2
+            if finished:
+                self._finish(on_done, job, parts["resume"], parts["cover_letter"])
+
+        resume_future = self._executor.submit(generate_resume_content, job_description, self.base_resume_info)
+        cover_future = self._executor.submit(generate_cover_letter, job_description, self.base_resume_info,
+                                             job['company'], job['title'])
+        resume_future.add_done_callback(lambda f: part_done("resume", f))
+        cover_future.add_done_callback(lambda f: part_done("cover_letter", f))
+
+    def _submit_batch(self):
+        batch, self._pending_batch = self._pending_batch, []
+        if not batch:
+            return
+
+        def run_batch():
+            try:
+                results = generate_documents_batch([(job, description) for job, description, _ in batch],
+                                                   self.base_resume_info)
+            except Exception as e:
+                failed = GeminiResult(ok=False, error=f"Generation failed: {e}")
+                results = [(failed, failed)] * len(batch)
+            for (job, _, on_done), (resume_result, cover_letter_result) in zip(batch, results):
+                self._finish(on_done, job, resume_result, cover_letter_result)
+
+        self._executor.submit(run_batch)
+
+    def _finish(self, on_done, job, resume_result, cover_letter_result):
+        try:
+            on_done(job, resume_result, cover_letter_result)
+        except Exception as e:
+            print(f"Error handing over generated documents for {job.get('title')} at {job.get('company')}: {e}")
+        finally:
+            # The slot is freed only once the job has been passed on, so the caller's backpressure holds
+            self._slots.release()
+            with self._lock:
+                self._outstanding -= 1
+                self._all_done.notify_all()
+
+    def join(self):
+        """Sends a final partial batch and waits until every submitted job has been passed to its on_done."""
+        with self._lock:
+            self._submit_batch()
+            while self._outstanding:
+                self._all_done.wait()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,391 @@
+# benchmark.py
+"""
+Offline benchmark for the job pipeline. Listing and job detail HTML (synthetic,
+or pages saved from Jobright with --pages-dir) is replayed through the
+scraper's parsing code, and Gemini and Google Sheets are replaced by stub
+clients with configurable latency and error rates. No network access, login
+or API key is needed.
+
+Usage:
+    python benchmark.py                                  # 10, 1k and 10k listings
+    python benchmark.py --sizes 1000 --gemini-error-rate 0.05 --output bench_output.txt
+    python benchmark.py --pages-dir saved_pages          # listing_*.html / detail_*.html
+
+Reports jobs/sec, count/p50/p95 latency per stage and peak traced memory.
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zlib
+from contextlib import redirect_stdout
+
+import gspread
+
+import ai_interaction
+import metrics
+from ai_interaction import GenerationPool, configure_rate_limit, configure_response_cache
+from html_parsing import parse_job_cards
+from job_index import JobIndex
+from pipeline import Pipeline, Stage
+from relevance import RelevanceScorer
+from sheets_logger import SheetWriter, get_existing_jobs, log_job_info
+from web_scraper import fetch_job_description_http, get_job_description
+
+CARDS_PER_LISTING_PAGE = 50 # Roughly what one scroll of the results list loads
+
+TITLES = ["Senior Python Engineer", "Data Engineer", "Machine Learning Engineer", "Backend Developer",
+          "Software Engineer, Data Platform", "Full Stack Developer", "Registered Nurse", "Sales Associate"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises", "Tyrell"]
+SKILLS = ["Python", "SQL", "AWS", "Docker", "Kubernetes", "PyTorch", "Spark", "React", "Airflow", "Kafka",
+          "Patient care", "CRM"]
+SYNTHETIC_RESUME = """
+Summary
+Software engineer focused on backend and data systems in Python.
+Skills
+Python, SQL, AWS, Docker, Kubernetes, PyTorch, Spark, Airflow, machine learning, data pipelines, backend APIs
+Experience
+Data Engineer, Example Corp Jan 2021 - Present
+* Built Spark and Airflow data pipelines processing 2TB/day on AWS
+* Developed Python backend services and machine learning model serving with Docker and Kubernetes
+"""
+
+
+# --- Synthetic pages ---
+
+def synthetic_listing_page(start_index, count):
+    """A search results page with `count` job cards, shaped like Jobright's markup."""
+    cards = []
+    for index in range(start_index, start_index + count):
+        cards.append(f"""
+        <div class="index_job-card__AsPKC" id="bench-{index}">
+          <h2 class="index_job-title__UjuEY">{TITLES[index % len(TITLES)]}</h2>
+          <div class="index_company-name__gKiOY">{COMPANIES[index % len(COMPANIES)]} {index // len(COMPANIES)}</div>
+          <div class="index_job-metadata-item__ThMv4"><img src="pin.svg"/><span>Remote, US</span></div>
+        </div>""")
+    return f"""<html><head><script src="app.js"></script><style>.x{{}}</style></head><body>
+    <nav>{"<a href='#'>link</a>" * 40}</nav>
+    <div class="index_jobs-list-container__DVqkj"><div id="scrollableDiv">{"".join(cards)}</div></div>
+    </body></html>"""
+
+def synthetic_detail_page(index):
+    """A job detail page with a responsibilities section and a skills section."""
+    rng = random.Random(index)
+    responsibilities = "".join(f"<li>Own {rng.choice(SKILLS)} services and improve reliability by {rng.randint(5, 50)}%.</li>"
+                               for _ in range(8))
+    skills = "".join(f"<li>{skill} experience</li>" for skill in rng.sample(SKILLS, 6))
+    return f"""<html><head><script>window.__APP__ = {{}};</script></head><body>
+    <header>{"<a href='#'>menu</a>" * 30}</header>
+    <section class="index_sectionContent__zTR73"><h3>Responsibilities</h3><ul>{responsibilities}</ul></section>
+    <section class="index_sectionContent__zTR73" id="skills-section"><h3>Qualifications</h3><ul>{skills}</ul></section>
+    <footer>{"<p>footer text</p>" * 20}</footer>
+    </body></html>"""
+
+def load_recorded_pages(pages_dir):
+    """Reads saved listing_*.html and detail_*.html pages."""
+    def read(pattern):
+        pages = []
+        for path in sorted(glob.glob(os.path.join(pages_dir, pattern))):
+            with open(path, 'r', encoding='utf-8') as f:
+                pages.append(f.read())
+        return pages
+    return read("listing_*.html"), read("detail_*.html")
+
+def iter_listing_pages(job_count, recorded_listings=None):
+    """Yields listing pages until about `job_count` cards have been produced."""
+    if not recorded_listings:
+        for start in range(0, job_count, CARDS_PER_LISTING_PAGE):
+            yield synthetic_listing_page(start, min(CARDS_PER_LISTING_PAGE, job_count - start))
+        return
+    # Recorded pages are replayed with their element ids made unique per replay so no card is deduped
+    produced = 0
+    replay = 0
+    while produced < job_count:
+        page = recorded_listings[replay % len(recorded_listings)]
+        produced += max(1, page.count('index_job-card'))
+        yield re.sub(r'\bid="', f'id="r{replay}-', page)
+        replay += 1
+
+
+# --- Stub backends ---
+
+class _StubDetailElement:
+    text = "ready"
+
+class StubDriver:
+    """Stands in for a logged-in WebDriver on job detail pages: get() 'loads' a replayed page."""
+
+    def __init__(self, detail_pages, latency=0.0):
+        self.detail_pages = detail_pages
+        self.latency = latency
+        self.page_source = ""
+
+    def get(self, url):
+        time.sleep(self.latency)
+        self.page_source = self.detail_pages[zlib.crc32(url.encode("utf-8")) % len(self.detail_pages)]
+
+    def find_elements(self, by, selector):
+        return [_StubDetailElement()]
+
+class _StubHttpResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.status_code = status_code
+
+class StubHttpSession:
+    """Stands in for the requests.Session of the HTTP fast path."""
+
+    def __init__(self, detail_pages, latency=0.0):
+        self.detail_pages = detail_pages
+        self.latency = latency
+
+    def get(self, url, timeout=None):
+        time.sleep(self.latency)
+        return _StubHttpResponse(self.detail_pages[zlib.crc32(url.encode("utf-8")) % len(self.detail_pages)])
+
+class _StubUsage:
+    def __init__(self, prompt, text):
+        self.prompt_token_count = len(prompt) // 4
+        self.candidates_token_count = len(text) // 4
+
+class _StubGeminiResponse:
+    def __init__(self, prompt, text):
+        self.text = text
+        self.parts = [text]
+        self.prompt_feedback = None
+        self.usage_metadata = _StubUsage(prompt, text)
+
+class StubGeminiModel:
+    """Answers generate_content() after `latency` seconds, failing with a quota error at `error_rate`."""
+
+    def __init__(self, profile, latency=0.0, error_rate=0.0):
+        self.profile = profile
+        self.latency = latency
+        self.error_rate = error_rate
+
+    def generate_content(self, prompt):
+        time.sleep(self.latency)
+        if random.random() < self.error_rate:
+            if ai_interaction.google_exceptions is not None:
+                raise ai_interaction.google_exceptions.ResourceExhausted("429 Quota exceeded (benchmark stub)")
+            raise ConnectionError("429 Quota exceeded (benchmark stub)")
+        if self.profile == "batch":
+            jobs = [{"job_index": index, "resume_bullet_points": "* Stub bullet point",
+                     "cover_letter": "Dear Hiring Manager,\n\nStub cover letter."}
+                    for index in range(prompt.count("=== Job "))]
+            return _StubGeminiResponse(prompt, json.dumps({"jobs": jobs}))
+        return _StubGeminiResponse(prompt, "* Stub bullet point\n* Another stub bullet point")
+
+def install_stub_gemini(latency, error_rate):
+    """Puts a StubGeminiModel in the model registry for every profile, so get_gemini_response() uses it."""
+    configure_rate_limit(0)
+    configure_response_cache(None)
+    with ai_interaction._models_lock:
+        for profile in ai_interaction.MODEL_PROFILES:
+            ai_interaction._models[profile] = StubGeminiModel(profile, latency, error_rate)
+
+class _StubApiResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = "Quota exceeded (benchmark stub)"
+
+    def json(self):
+        return {"error": {"code": self.status_code, "message": self.text, "status": "RESOURCE_EXHAUSTED"}}
+
+class StubWorksheet:
+    """In-memory worksheet with the gspread calls the logger uses."""
+
+    def __init__(self, latency=0.0, error_rate=0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rows = [["Company", "Role", "Description", "URL"]]
+        self._lock = threading.Lock()
+
+    def get(self, cell_range):
+        time.sleep(self.latency)
+        first_row = int(re.match(r"A(\d+)", cell_range).group(1))
+        with self._lock:
+            return [row[:2] for row in self.rows[first_row - 1:]]
+
+    def append_rows(self, rows):
+        time.sleep(self.latency)
+        if random.random() < self.error_rate:
+            raise gspread.exceptions.APIError(_StubApiResponse(429))
+        with self._lock:
+            self.rows.extend(rows)
+
+class _StubSpreadsheet:
+    def __init__(self, worksheet):
+        self.sheet1 = worksheet
+
+class StubSheetsClient:
+    def __init__(self, latency=0.0, error_rate=0.0):
+        self.worksheet = StubWorksheet(latency, error_rate)
+
+    def open_by_key(self, sheet_id):
+        return _StubSpreadsheet(self.worksheet)
+
+
+# --- Benchmark run ---
+
+def run_benchmark(job_count, args, recorded_listings, detail_pages, work_dir):
+    """Runs `job_count` listings through list -> dedupe -> fetch -> score -> generate -> log. Returns a report dict."""
+    metrics.reset()
+    install_stub_gemini(args.gemini_latency, args.gemini_error_rate)
+    sheets_client = StubSheetsClient(args.sheets_latency, args.sheets_error_rate)
+    existing_jobs = get_existing_jobs(sheets_client, "benchmark-sheet")
+    job_index = JobIndex(os.path.join(work_dir, f"job_index_{job_count}.sqlite3"))
+    job_index.add_keys(existing_jobs)
+    relevance_scorer = RelevanceScorer(SYNTHETIC_RESUME)
+    sheet_writer = SheetWriter(sheets_client, "benchmark-sheet", max_rows=args.sheets_batch_size, base_delay=0.05,
+                               on_written=job_index.add_many)
+    generation_pool = GenerationPool(SYNTHETIC_RESUME, max_concurrency=args.gemini_concurrency,
+                                     batch_size=args.generation_batch_size) if args.generate else None
+    fetchers = threading.local() # One stub driver/session per fetch worker, as in FetchPool
+    seen_ids = set()
+    logged = {"count": 0}
+
+    def list_jobs(page, emit):
+        for job in parse_job_cards(page, seen_ids):
+            emit(job)
+
+    def dedupe(job, emit):
+        if job_index.claim(job) and relevance_scorer.filter_by_title([job], args.title_threshold):
+            emit(job)
+
+    def fetch_description(job, emit):
+        if args.fetch_mode == "browser":
+            if not hasattr(fetchers, "driver"):
+                fetchers.driver = StubDriver(detail_pages, args.fetch_latency)
+            job_description = get_job_description(fetchers.driver, job["url"])
+        else:
+            if not hasattr(fetchers, "session"):
+                fetchers.session = StubHttpSession(detail_pages, args.fetch_latency)
+            job_description = fetch_job_description_http(fetchers.session, job["url"])
+        if job_description and "Error fetching description" not in job_description:
+            job["description"] = job_description
+            emit(job)
+
+    def score(job, emit):
+        job["skills_score"] = relevance_scorer.score_skills(job["description"])
+        emit(job)
+
+    def generate(job, emit):
+        if not generation_pool or job["skills_score"] < args.skills_threshold:
+            emit(job)
+            return
+        generation_pool.submit(job, job["description"], lambda job_done, *results: emit(job_done))
+
+    def finish_generation(emit):
+        if generation_pool:
+            generation_pool.join()
+
+    def log(job, emit):
+        log_job_info(sheet_writer, existing_jobs, job["company"], job["title"], job["description"], job["url"], item=job)
+        logged["count"] += 1
+
+    pipeline = Pipeline([
+        Stage("list", list_jobs),
+        Stage("dedupe", dedupe),
+        Stage("fetch", fetch_description, workers=args.fetch_workers),
+        Stage("score", score),
+        Stage("generate", generate, on_close=finish_generation),
+        Stage("log", log),
+    ], report_interval=3600)
+
+    if args.memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull): # The scraper prints every job
+            pipeline.run(iter_listing_pages(job_count, recorded_listings))
+            sheet_writer.close()
+        elapsed = time.perf_counter() - start
+        peak_memory = tracemalloc.get_traced_memory()[1] if args.memory else None
+    finally:
+        if args.memory:
+            tracemalloc.stop()
+        if generation_pool:
+            generation_pool.close()
+        job_index.close()
+
+    return {
+        "listings": job_count,
+        "jobs_listed": pipeline.stages[0].emitted,
+        "jobs_logged": logged["count"],
+        "rows_written": len(sheets_client.worksheet.rows) - 1,
+        "seconds": round(elapsed, 3),
+        "jobs_per_second": round(logged["count"] / elapsed, 1) if elapsed else 0.0,
+        "peak_memory_mb": round(peak_memory / (1024 * 1024), 2) if peak_memory is not None else None,
+        **metrics.snapshot(),
+    }
+
+def format_report(report):
+    lines = [f"=== {report['listings']} listings: {report['jobs_logged']} jobs in {report['seconds']:.2f}s "
+             f"({report['jobs_per_second']} jobs/sec), {report['rows_written']} rows written"
+             + (f", peak memory {report['peak_memory_mb']} MB" if report["peak_memory_mb"] is not None else "")]
+    lines.append(f"{'stage':<32}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'total s':>10}")
+    for stage, stats in sorted(report["stages"].items()):
+        lines.append(f"{stage:<32}{stats['count']:>8}{stats['p50'] * 1000:>10.2f}{stats['p95'] * 1000:>10.2f}"
+                     f"{stats['max'] * 1000:>10.2f}{stats['total_seconds']:>10.2f}")
+    if report["counters"]:
+        lines.append("counters: " + ", ".join(f"{name}={value}" for name, value in sorted(report["counters"].items())))
+    return "\n".join(lines)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark of the scraping/generation/logging pipeline.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000], help="Listing counts to run.")
+    parser.add_argument("--pages-dir", help="Directory with saved listing_*.html and detail_*.html pages.")
+    parser.add_argument("--fetch-mode", choices=["http", "browser"], default="http",
+                        help="Replay detail pages through the HTTP fast path or get_job_description().")
+    parser.add_argument("--fetch-workers", type=int, default=3)
+    parser.add_argument("--fetch-latency", type=float, default=0.0, help="Seconds per detail page load.")
+    parser.add_argument("--no-generate", dest="generate", action="store_false", help="Skip the Gemini stage.")
+    parser.add_argument("--gemini-latency", type=float, default=0.005, help="Seconds per stub Gemini call.")
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0, help="Share of Gemini calls failing with 429.")
+    parser.add_argument("--gemini-concurrency", type=int, default=8)
+    parser.add_argument("--generation-batch-size", type=int, default=1)
+    parser.add_argument("--sheets-latency", type=float, default=0.01, help="Seconds per stub Sheets call.")
+    parser.add_argument("--sheets-error-rate", type=float, default=0.0, help="Share of Sheets writes failing with 429.")
+    parser.add_argument("--sheets-batch-size", type=int, default=20)
+    parser.add_argument("--title-threshold", type=float, default=0.2)
+    parser.add_argument("--skills-threshold", type=float, default=0.1)
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="Skip tracemalloc (it slows the run down noticeably).")
+    parser.add_argument("--output", help="Also append the reports to this file (e.g. bench_output.txt).")
+    parser.add_argument("--json", dest="json_output", help="Write the raw reports as JSON to this file.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    recorded_listings, detail_pages = load_recorded_pages(args.pages_dir) if args.pages_dir else ([], [])
+    if args.pages_dir:
+        print(f"Replaying {len(recorded_listings)} listing pages and {len(detail_pages)} detail pages from {args.pages_dir}.")
+    if not detail_pages:
+        detail_pages = [synthetic_detail_page(index) for index in range(50)]
+
+    reports = []
+    with tempfile.TemporaryDirectory(prefix="job_bench_") as work_dir:
+        for size in args.sizes:
+            report = run_benchmark(size, args, recorded_listings, detail_pages, work_dir)
+            reports.append(report)
+            text = format_report(report)
+            print(text + "\n")
+            if args.output:
+                with open(args.output, 'a', encoding='utf-8') as f:
+                    f.write(text + "\n\n")
+    if args.json_output:
+        with open(args.json_output, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+    return reports
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
-import fitz 
+
+from resume_parser import load_resume_sections
 
 def load_config():
     """Loads configuration from .env file."""
@@ -22,34 +23,40 @@ def load_config():
     
     if not os.path.isdir(config["downloads_folder"]):
          print(f"Warning: Downloads folder specified in .env does not exist: {config['downloads_folder']}")
+
+    # Optional tuning settings (defaults are used when they are not set in .env)
+    config.update({
+        "search_urls": [url for url in os.getenv("SEARCH_URLS", "https://jobright.ai/jobs/recommend?login=true").split(",") if url.strip()],
+        "crawl_workers": int(os.getenv("CRAWL_WORKERS", "2")),
+        "fetch_workers": int(os.getenv("FETCH_WORKERS", "3")),
+        "fetch_per_domain_limit": int(os.getenv("FETCH_PER_DOMAIN_LIMIT", "3")),
+        "fetch_rate_limit": float(os.getenv("FETCH_RATE_LIMIT", "2")), # Page loads per second across all sessions
+        "http_fast_path": os.getenv("HTTP_FAST_PATH", "true").lower() == "true",
+        "browser_headless": os.getenv("BROWSER_HEADLESS", "true").lower() == "true",
+        "block_browser_resources": os.getenv("BLOCK_BROWSER_RESOURCES", "true").lower() == "true",
+        "data_dir": os.getenv("DATA_DIR", "local_data"), # Local caches and indexes kept between runs
+        "description_cache_ttl_hours": float(os.getenv("DESCRIPTION_CACHE_TTL_HOURS", "168")),
+        "description_cache_max_entries": int(os.getenv("DESCRIPTION_CACHE_MAX_ENTRIES", "20000")),
+        "sheets_batch_size": int(os.getenv("SHEETS_BATCH_SIZE", "20")),
+        "sheets_flush_seconds": float(os.getenv("SHEETS_FLUSH_SECONDS", "30")),
+        "generate_documents": os.getenv("GENERATE_DOCUMENTS", "false").lower() == "true",
+        "gemini_concurrency": int(os.getenv("GEMINI_CONCURRENCY", "4")),
+        "gemini_requests_per_minute": float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "15")), # Free tier quota
+        "generation_batch_size": int(os.getenv("GENERATION_BATCH_SIZE", "1")), # Jobs per Gemini request; 1 = one request per document
+        "title_relevance_threshold": float(os.getenv("TITLE_RELEVANCE_THRESHOLD", "0.2")), # 0 disables
+        "skills_relevance_threshold": float(os.getenv("SKILLS_RELEVANCE_THRESHOLD", "0.1")), # 0 disables
+        "response_cache_max_entries": int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000")),
+        "render_resumes": os.getenv("RENDER_RESUMES", "true").lower() == "true",
+        "resume_render_workers": int(os.getenv("RESUME_RENDER_WORKERS", "2")),
+        "resume_template_file": os.getenv("RESUME_TEMPLATE_FILE") or None, # Built-in layout when not set
+        "save_cover_letter_files": os.getenv("SAVE_COVER_LETTER_FILES", "true").lower() == "true",
+        "journal_batch_size": int(os.getenv("JOURNAL_BATCH_SIZE", "25")),
+        "journal_max_attempts": int(os.getenv("JOURNAL_MAX_ATTEMPTS", "3")),
+        "profile_job": os.getenv("PROFILE_JOB", "false").lower() == "true",
+    })
     return config
     
     
-# def load_base_resume_info(filepath):
-#     """Loads base resume information from a text file."""
-#     try:
-#         with open(filepath, 'r', encoding='utf-8') as f:
-#             return f.read()
-#     except FileNotFoundError:
-#         print(f"Error: Base resume file not found at {filepath}")
-#         return "Experienced professional seeking new opportunities." # Default fallback
-#     except Exception as e:
-#         print(f"Error reading base resume file: {e}")
-#         return "Experienced professional seeking new opportunities."
-    
-
-def load_base_resume_info(filepath):
-    """Loads text from a resume PDF file."""
-    try:
-        doc = fitz.open(filepath)
-        resume_text = ""
-        for page in doc:
-            resume_text += page.get_text()
-        doc.close()
-        return resume_text.strip()
-    except FileNotFoundError:
-        print(f"File not found at: {filepath}")
-        return "Experienced professional seeking new opportunities."
-    except Exception as e:
-        print(f"Error reading PDF file: {e}")
-        return "Experienced professional seeking new opportunities."
\ No newline at end of file
+def load_base_resume_info(filepath, cache_dir=None):
+    """Loads text from a resume PDF file (re-extracted only when the PDF changes if cache_dir is set)."""
+    return load_resume_sections(filepath, cache_dir=cache_dir)["full_text"]
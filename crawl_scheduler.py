@@ -0,0 +1,175 @@
+# crawl_scheduler.py
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+from urllib.parse import quote_plus, urlparse
+
+from web_scraper import setup_driver, apply_session_cookies, iter_jobright_listings
+
+SEARCH_URL_TEMPLATE = "https://jobright.ai/jobs/search?value={query}" # GUESS - adjust to Jobright's search URL
+UNSORTED_FEED_PATHS = ("/jobs/recommend",) # Not newest-first, so seen cards say nothing about what follows
+MAX_CURSOR_IDS = 2000 # Most recent job ids remembered per query
+_DONE = object()
+
+
+def search_url_for(query):
+    """Search entries may be full URLs or plain queries (e.g. "data engineer")."""
+    query = query.strip()
+    if query.startswith(("http://", "https://")):
+        return query
+    return SEARCH_URL_TEMPLATE.format(query=quote_plus(query))
+
+def stops_at_known_jobs(search_url):
+    """Only listings sorted newest-first can stop scrolling once they reach jobs seen before."""
+    return not urlparse(search_url).path.rstrip("/").endswith(UNSORTED_FEED_PATHS)
+
+
+class CrawlScheduler:
+    """
+    Crawls several Jobright searches on up to `workers` logged-in browser sessions.
+    Each search keeps a cursor (the job ids it returned on earlier runs) so a
+    newest-first listing is only scrolled until already-seen cards appear (the
+    recommendation feed is always scrolled to the end), and jobs are
+    deduplicated across searches by job id. Cursors are saved on close() and
+    only take in jobs for which `is_settled(job)` is true (e.g. journaled or
+    already processed), so jobs still in flight are listed again next run.
+    """
+
+    def __init__(self, searches, cookies, cursor_file, workers=2, seed_driver=None, driver_settings=None,
+                 queue_size=100, is_settled=None):
+        self.search_urls = list(dict.fromkeys(search_url_for(search) for search in searches if search.strip()))
+        self.cookies = cookies or []
+        self.cursor_file = cursor_file
+        self.workers = max(1, min(workers, len(self.search_urls) or 1))
+        self.seed_driver = seed_driver
+        self.driver_settings = driver_settings or {}
+        self.is_settled = is_settled
+        self._walked = {} # search_url -> [(job_id, company, title)] returned this run, newest first
+        self._owned_drivers = []
+        self._output = queue.Queue(maxsize=queue_size)
+        self._seen_ids = set()
+        self._lock = threading.Lock()
+        self.cursors = self._load_cursors()
+
+    def _load_cursors(self):
+        if not self.cursor_file or not os.path.exists(self.cursor_file):
+            return {}
+        try:
+            with open(self.cursor_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable crawl cursors {self.cursor_file}: {e}")
+            return {}
+
+    def _save_cursors(self):
+        if not self.cursor_file:
+            return
+        try:
+            directory = os.path.dirname(self.cursor_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._lock:
+                data = json.dumps(self.cursors)
+            temp_file = self.cursor_file + ".tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_file, self.cursor_file)
+        except Exception as e:
+            print(f"Error saving crawl cursors: {e}")
+
+    def _new_driver(self):
+        driver = setup_driver(**self.driver_settings)
+        if driver:
+            apply_session_cookies(driver, self.cookies)
+            with self._lock:
+                self._owned_drivers.append(driver)
+        return driver
+
+    def _crawl_search(self, driver, search_url):
+        with self._lock:
+            cursor = self.cursors.get(search_url, {})
+        known_ids = set(cursor.get("recent_ids", []))
+        returned = []
+        with self._lock:
+            self._walked[search_url] = returned
+        use_cursor = cursor and stops_at_known_jobs(search_url)
+        for job in iter_jobright_listings(driver, search_url, known_ids=known_ids if use_cursor else None):
+            returned.append((job["job_id"], job.get("company"), job.get("title")))
+            with self._lock:
+                if job["job_id"] in self._seen_ids:
+                    continue # Already found by another search this run
+                self._seen_ids.add(job["job_id"])
+            self._output.put(job)
+        print(f"Finished search {search_url}: {len(returned)} listings walked.")
+
+    def _advance_cursors(self):
+        """Adds the settled jobs walked this run to their searches' cursors."""
+        with self._lock:
+            walked = dict(self._walked)
+            self._walked = {}
+        for search_url, returned in walked.items():
+            settled_ids = [job_id for job_id, company, title in returned
+                           if not self.is_settled or self.is_settled({"job_id": job_id, "company": company, "title": title})]
+            with self._lock:
+                cursor = self.cursors.get(search_url, {})
+                # Newest ids first, followed by the older ones that were not seen again
+                recent_ids = list(dict.fromkeys(settled_ids + cursor.get("recent_ids", [])))[:MAX_CURSOR_IDS]
+                self.cursors[search_url] = {"recent_ids": recent_ids,
+                                            "last_run": datetime.now().isoformat(timespec="seconds")}
+            print(f"Cursor for {search_url}: {len(settled_ids)} of {len(returned)} walked listings settled.")
+        if walked:
+            self._save_cursors()
+
+    def _worker(self, index, searches):
+        try:
+            driver = self.seed_driver if index == 0 and self.seed_driver else self._new_driver()
+            if not driver:
+                print("Could not start a browser session for crawling. Its searches are skipped.")
+                return
+            while True:
+                try:
+                    search_url = searches.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    self._crawl_search(driver, search_url)
+                except Exception as e:
+                    print(f"Error crawling {search_url}: {e}")
+        finally:
+            self._output.put(_DONE)
+
+    def crawl(self):
+        """Yields new jobs from all searches as they are found."""
+        searches = queue.Queue()
+        for search_url in self.search_urls:
+            searches.put(search_url)
+        threads = [threading.Thread(target=self._worker, args=(index, searches), name=f"crawl-{index}", daemon=True)
+                   for index in range(self.workers)]
+        for thread in threads:
+            thread.start()
+
+        finished_workers = 0
+        while finished_workers < len(threads):
+            item = self._output.get()
+            if item is _DONE:
+                finished_workers += 1
+                continue
+            yield item
+        for thread in threads:
+            thread.join()
+
+    def close(self):
+        """
+        Saves the search cursors and quits the browser sessions this scheduler
+        started (the seed driver is left to its owner). Call it once the jobs'
+        progress is recorded, so `is_settled` sees it.
+        """
+        self._advance_cursors()
+        for driver in self._owned_drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"Error closing crawl browser session: {e}")
+        self._owned_drivers = []
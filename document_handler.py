@@ -7,9 +7,9 @@ def save_text_to_file(content, filename):
     """Saves text content to a file."""
     try:
         directory = os.path.dirname(filename)
-        if directory and not os.path.exists(directory):
-             os.makedirs(directory)
-             
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(content)
         print(f"Successfully saved content to: {filename}")
@@ -18,24 +18,61 @@ def save_text_to_file(content, filename):
         print(f"Error saving file {filename}: {e}")
         return False
 
-def find_latest_resume_pdf(download_folder, base_name="YourName_Resume"):
+def _index_new_pdfs(download_folder, known):
+    """Adds the PDFs not yet in `known` ({path: mtime}) and returns their paths; known files are not stat'ed again."""
+    added = []
+    with os.scandir(download_folder) as entries:
+        for entry in entries:
+            if entry.path not in known and entry.name.lower().endswith('.pdf') and entry.is_file():
+                known[entry.path] = entry.stat().st_mtime
+                added.append(entry.path)
+    return added
+
+def find_latest_resume_pdf(download_folder, base_name="YourName_Resume", since=None, timeout=30, poll_interval=0.25):
     """
     Finds the most recently downloaded PDF in the specified folder,
     assuming a naming convention after manual download from Overleaf.
     THIS IS A GUESS - requires user to download with a predictable name.
     A better approach might involve asking the user to confirm the file path.
+    With `since` (a time.time() value), only PDFs modified after it count: the
+    folder is polled for new files until one exists and its size has stopped
+    changing (download finished), for up to `timeout` seconds. Without it, the
+    latest PDF already in the folder is returned at once.
     """
     print(f"Searching for latest resume PDF in: {download_folder}")
-    time.sleep(5) # Give time for download to complete
+    known = {} # PDF path -> mtime, from the first scan plus any files that appear later
 
     try:
-        files = [os.path.join(download_folder, f) for f in os.listdir(download_folder) if f.lower().endswith('.pdf')]
-        if not files:
-            print("No PDF files found in the download folder.")
-            return None
+        new_paths = _index_new_pdfs(download_folder, known)
+        if since is None:
+            if not known:
+                print("No PDF files found in the download folder.")
+                return None
+            latest_file = max(known, key=known.get)
+        else:
+            deadline = time.monotonic() + timeout
+            latest_file, last_size = None, None
+            while True:
+                recent = [path for path in new_paths if known[path] >= since]
+                if recent:
+                    newest = max(recent, key=known.get)
+                    if latest_file is None or known[newest] > known[latest_file]:
+                        latest_file, last_size = newest, None
+                if latest_file:
+                    try:
+                        size = os.path.getsize(latest_file) # Only the file being downloaded is checked again
+                    except OSError:
+                        known.pop(latest_file, None) # Renamed or removed meanwhile
+                        latest_file, size = None, None
+                    if size and size == last_size:
+                        break
+                    last_size = size
+                if time.monotonic() >= deadline:
+                    print("No new PDF file found in the download folder.")
+                    return None
+                time.sleep(poll_interval)
+                new_paths = _index_new_pdfs(download_folder, known)
 
-        # Find the most recently modified PDF file
-        latest_file = max(files, key=os.path.getmtime)
         print(f"Found potential latest resume: {latest_file}")
         # Optional: Add a check if filename contains base_name or similar?
         # if base_name.lower() in os.path.basename(latest_file).lower():
@@ -0,0 +1,124 @@
+# document_store.py
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from job_index import normalize_job_key
+
+
+class DocumentStore:
+    """
+    SQLite archive of generated documents (resume content, cover letters, PDFs).
+    Contents are stored once per SHA-256 hash, and each saved document is indexed
+    by job id and by normalized company and role, so regenerating identical text
+    adds only an index row.
+    """
+
+    def __init__(self, db_path):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS contents (
+                content_hash TEXT PRIMARY KEY,
+                content BLOB NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                job_id TEXT,
+                company TEXT NOT NULL,
+                role TEXT NOT NULL,
+                company_key TEXT NOT NULL,
+                role_key TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                file_name TEXT,
+                content_hash TEXT NOT NULL REFERENCES contents (content_hash),
+                created_at REAL NOT NULL,
+                UNIQUE (job_id, kind, content_hash)
+            );
+            CREATE INDEX IF NOT EXISTS idx_documents_job ON documents (job_id, kind);
+            CREATE INDEX IF NOT EXISTS idx_documents_company_role ON documents (company_key, role_key, kind);
+        """)
+        self._conn.commit()
+
+    def save(self, job_id, company, role, kind, content, file_name=None):
+        """
+        Stores a document (str or bytes) of `kind` (e.g. "cover_letter") for a job.
+        Returns (content_hash, is_new); is_new is False when the same content was
+        already stored for this job.
+        """
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        content_hash = hashlib.sha256(data).hexdigest()
+        company_key, role_key = normalize_job_key(company, role)
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute("INSERT OR IGNORE INTO contents (content_hash, content, size) VALUES (?, ?, ?)",
+                                       (content_hash, data, len(data)))
+                    cursor = self._conn.execute("""
+                        INSERT OR IGNORE INTO documents
+                            (job_id, company, role, company_key, role_key, kind, file_name, content_hash, created_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                        (job_id, company, role, company_key, role_key, kind, file_name, content_hash, time.time()))
+                return content_hash, cursor.rowcount > 0
+            except sqlite3.Error as e:
+                print(f"Error storing {kind} for {role} at {company}: {e}")
+                return None, False
+
+    def find(self, job_id=None, company=None, role=None, kind=None):
+        """Returns matching documents (newest first) as dicts without their content."""
+        conditions, values = [], []
+        if job_id is not None:
+            conditions.append("job_id = ?")
+            values.append(job_id)
+        if company is not None or role is not None:
+            company_key, role_key = normalize_job_key(company, role)
+            if company is not None:
+                conditions.append("company_key = ?")
+                values.append(company_key)
+            if role is not None:
+                conditions.append("role_key = ?")
+                values.append(role_key)
+        if kind is not None:
+            conditions.append("kind = ?")
+            values.append(kind)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._conn.execute(f"""
+                SELECT job_id, company, role, kind, file_name, content_hash, created_at
+                FROM documents {where} ORDER BY created_at DESC""", values).fetchall()
+        columns = ("job_id", "company", "role", "kind", "file_name", "content_hash", "created_at")
+        return [dict(zip(columns, row)) for row in rows]
+
+    def get_content(self, content_hash):
+        """Returns the stored bytes for a content hash, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT content FROM contents WHERE content_hash = ?", (content_hash,)).fetchone()
+        return bytes(row[0]) if row else None
+
+    def export(self, content_hash, path):
+        """Writes a stored document to `path`. Returns the path, or None on failure."""
+        content = self.get_content(content_hash)
+        if content is None:
+            print(f"Error: No stored document with hash {content_hash}.")
+            return None
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(content)
+            return path
+        except Exception as e:
+            print(f"Error exporting document to {path}: {e}")
+            return None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
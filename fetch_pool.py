@@ -0,0 +1,117 @@
+# fetch_pool.py
+import queue
+import threading
+from urllib.parse import urlparse
+
+from rate_limit import TokenBucket
+from web_scraper import (setup_driver, apply_session_cookies, get_job_description,
+                         create_http_session, fetch_job_description_http, job_id_from_url)
+
+
+class FetchPool:
+    """
+    Pool of browser sessions sharing one Jobright login, used to fetch job
+    descriptions concurrently. Sessions are created lazily (up to `workers`),
+    each domain is capped at `per_domain_limit` in-flight pages and all page
+    loads share a `rate_per_second` token bucket. With `http_fast_path` the
+    page is first requested without a browser; a session is only used when
+    that returns no content. Jobs found in the optional DescriptionCache skip
+    the network entirely.
+    """
+
+    def __init__(self, cookies, workers=3, per_domain_limit=3, rate_per_second=2.0, seed_driver=None,
+                 http_fast_path=True, cache=None, driver_settings=None):
+        self.cookies = cookies or []
+        self.driver_settings = driver_settings or {} # Keyword arguments for setup_driver()
+        self.http_fast_path = http_fast_path
+        self.cache = cache
+        self.workers = max(1, int(workers))
+        self.per_domain_limit = max(1, int(per_domain_limit))
+        self.rate_limiter = TokenBucket(rate_per_second, capacity=self.workers)
+
+        self._idle_drivers = queue.Queue()
+        self._drivers = []          # Every driver handed out by the pool
+        self._owned_drivers = []    # Drivers created (and therefore closed) by the pool
+        self._driver_lock = threading.Lock()
+        self._domain_semaphores = {}
+        self._domain_lock = threading.Lock()
+        self._thread_local = threading.local() # One requests.Session per worker thread
+
+        if seed_driver:
+            # The already logged-in driver can serve as the first session
+            self._drivers.append(seed_driver)
+            self._idle_drivers.put(seed_driver)
+
+    def _domain_semaphore(self, url):
+        domain = urlparse(url).netloc
+        with self._domain_lock:
+            if domain not in self._domain_semaphores:
+                self._domain_semaphores[domain] = threading.BoundedSemaphore(self.per_domain_limit)
+            return self._domain_semaphores[domain]
+
+    def _acquire_driver(self):
+        try:
+            return self._idle_drivers.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._driver_lock:
+            if len(self._drivers) < self.workers:
+                driver = setup_driver(**self.driver_settings)
+                if driver:
+                    apply_session_cookies(driver, self.cookies)
+                    self._drivers.append(driver)
+                    self._owned_drivers.append(driver)
+                    return driver
+                if not self._drivers:
+                    raise RuntimeError("Could not start any browser session for the fetch pool.")
+
+        # Every session is busy; wait for one to be released
+        return self._idle_drivers.get()
+
+    def _release_driver(self, driver):
+        self._idle_drivers.put(driver)
+
+    def _http_session(self):
+        session = getattr(self._thread_local, "session", None)
+        if session is None:
+            session = create_http_session(self.cookies)
+            self._thread_local.session = session
+        return session
+
+    def fetch(self, job):
+        """Fetches the description for one job. Returns (job, description)."""
+        job_id = job.get("job_id") or job_id_from_url(job["url"])
+        if self.cache:
+            cached_description = self.cache.get(job_id)
+            if cached_description:
+                return job, cached_description
+
+        with self._domain_semaphore(job["url"]):
+            self.rate_limiter.acquire()
+            if self.http_fast_path:
+                job_description = fetch_job_description_http(self._http_session(), job["url"])
+                if job_description:
+                    if self.cache:
+                        self.cache.put(job_id, job_description)
+                    return job, job_description
+                print(f"HTTP fast path found no content, falling back to the browser: {job['url']}")
+
+            driver = self._acquire_driver()
+            try:
+                # The cache was already checked above; looking again would count a second miss
+                job_description = get_job_description(driver, job["url"])
+            finally:
+                self._release_driver(driver)
+            if self.cache and job_description and not job_description.startswith(("Error fetching description", "No description found")):
+                self.cache.put(job_id, job_description)
+            return job, job_description
+
+    def close(self):
+        """Quits every browser session the pool started (the seed driver is left to its owner)."""
+        for driver in self._owned_drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"Error closing pooled browser session: {e}")
+        self._owned_drivers = []
@@ -0,0 +1,200 @@
+# html_parsing.py
+import json
+import re
+import threading
+import time
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+
+# lxml is a C parser, several times faster than html.parser on large listing pages
+PARSER = "lxml"
+
+# Pre-compiled selectors (adjust these based on actual Jobright structure)
+CARD_SELECTOR = soupsieve.compile("div[class*='index_job-card']") # "div.index_job-card__AsPKC"
+CARD_TITLE_SELECTOR = soupsieve.compile("h2[class*='index_job-title']") # "h2.index_job-title__UjuEY"
+CARD_COMPANY_SELECTOR = soupsieve.compile("div[class*='index_company-name']") # "div.index_company-name__gKiOY"
+CARD_LOCATION_SELECTOR = soupsieve.compile("div[class*='index_job-metadata-item'] span") # "div.index_job-metadata-item__ThMv4 span"
+SECTION_SELECTOR = soupsieve.compile("section[class*='index_sectionContent']") # "section.index_sectionContent__zTR73"
+SKILLS_SELECTOR = soupsieve.compile("section#skills-section")
+JSON_SCRIPT_SELECTOR = soupsieve.compile("script#__NEXT_DATA__, script[type='application/json']")
+
+# Only these nodes (and their children) are built into the tree; the rest of the page is skipped
+CARD_STRAINER = SoupStrainer("div", attrs={"class": re.compile("index_job-card")})
+SECTION_STRAINER = SoupStrainer("section")
+SCRIPT_STRAINER = SoupStrainer("script")
+
+_parse_stats = {}
+_parse_stats_lock = threading.Lock()
+
+
+def _record_parse(page_type, seconds, size):
+    with _parse_stats_lock:
+        stats = _parse_stats.setdefault(page_type, {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "bytes": 0})
+        stats["count"] += 1
+        stats["seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        stats["bytes"] += size
+
+def get_parse_stats():
+    """Returns {page_type: {"count", "seconds", "max_seconds", "bytes"}} for the pages parsed so far."""
+    with _parse_stats_lock:
+        return {page_type: dict(stats) for page_type, stats in _parse_stats.items()}
+
+def make_job(job_id, title, company, location):
+    """Builds the job dict used throughout the pipeline from a listing card's fields."""
+    # Job detail pages live under Jobright's base URL, keyed by the card id
+    job_url = f"https://jobright.ai/jobs/info/{job_id}"
+    print(f"  - Found: {title} at {company}")
+    return {
+        "job_id": job_id,
+        "title": title,
+        "company": company,
+        "location": location or "N/A",
+        "url": job_url, # This might be the link to apply OR a details page on Jobright
+        "description": None # Will fetch description later
+    }
+
+
+def parse_job_cards(page_source, seen_ids):
+    """Returns the jobs on a search results page whose ids are not in `seen_ids` (which is updated)."""
+    start = time.perf_counter()
+    soup = BeautifulSoup(page_source, PARSER, parse_only=CARD_STRAINER)
+    job_cards = CARD_SELECTOR.select(soup)
+
+    jobs = []
+    for card in job_cards:
+        try:
+            job_id = card.get("id")
+            if not job_id or job_id in seen_ids:
+                continue
+            seen_ids.add(job_id)
+            print('job_id:', job_id)
+            title_element = CARD_TITLE_SELECTOR.select_one(card)
+            company_element = CARD_COMPANY_SELECTOR.select_one(card)
+            location_element = CARD_LOCATION_SELECTOR.select_one(card)
+
+            if title_element and company_element and job_id:
+                jobs.append(make_job(job_id,
+                                      title_element.get_text(strip=True),
+                                      company_element.get_text(strip=True),
+                                      location_element.get_text(strip=True) if location_element else None))
+            else:
+                print("  - Skipping card, missing required elements (title, company, or link).")
+        except Exception as e:
+            print(f"  - Error parsing a job card: {e}")
+    _record_parse("listing", time.perf_counter() - start, len(page_source))
+    return jobs
+
+
+def _combine_description(responsibilities, skills):
+    return "\n\n".join(filter(None, [
+        "Responsibilities:\n" + responsibilities if responsibilities else None,
+        "Skills & Qualifications:\n" + skills if skills else None
+    ]))
+
+def _flatten_json_text(value):
+    """Flattens strings nested in JSON lists/dicts into newline separated text."""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        return "\n".join(filter(None, (_flatten_json_text(v) for v in value)))
+    return ""
+
+# These id key names are GUESSES as well - adjust if Jobright changes its payload
+JOB_ID_KEYS = ("jobId", "job_id", "id")
+
+def _json_object_id(node):
+    for key in JOB_ID_KEYS:
+        if key in node:
+            return str(node[key])
+    return None
+
+def _find_job_object(data, job_id):
+    """Returns the first JSON object whose id field equals `job_id` (the page also embeds other jobs)."""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if _json_object_id(node) == job_id:
+                return node
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return None
+
+def _find_json_values(data, keys):
+    """Collects the values of any of `keys` found in a job's JSON object, skipping objects nested in it with other ids."""
+    found = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if node is not data and _json_object_id(node) not in (None, _json_object_id(data)):
+                continue # E.g. a similar job embedded in this one
+            for key, value in node.items():
+                if key in keys:
+                    found.append(value)
+                else:
+                    stack.append(value)
+        elif isinstance(node, list):
+            stack.extend(node)
+    return found
+
+def _parse_embedded_json_description(html, job_id):
+    """
+    Extracts responsibilities/skills from JSON embedded in the page (e.g. Next.js
+    __NEXT_DATA__), reading only the object for `job_id` so similar or recommended
+    jobs in the payload are not mixed in. Returns "" if that job is not found.
+    """
+    # These key names are GUESSES based on the rendered section titles - adjust if Jobright changes its payload
+    responsibility_keys = {"coreResponsibilities", "responsibilities"}
+    skill_keys = {"qualifications", "skillSummaries", "requirements", "preferredQualifications"}
+
+    soup = BeautifulSoup(html, PARSER, parse_only=SCRIPT_STRAINER)
+    for script in JSON_SCRIPT_SELECTOR.select(soup):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        data = _find_job_object(data, job_id)
+        if data is None:
+            continue
+        responsibilities = "\n".join(filter(None, (_flatten_json_text(v) for v in _find_json_values(data, responsibility_keys))))
+        skills = "\n".join(filter(None, (_flatten_json_text(v) for v in _find_json_values(data, skill_keys))))
+        full_description = _combine_description(responsibilities, skills)
+        if full_description:
+            return full_description
+    return ""
+
+def parse_job_description(html, job_id=None):
+    """
+    Extracts the responsibilities and skills sections from a job detail page's HTML.
+    With `job_id`, the page's embedded JSON is searched when no sections were rendered.
+    """
+    start = time.perf_counter()
+    soup = BeautifulSoup(html, PARSER, parse_only=SECTION_STRAINER)
+
+    # --- Responsibilities ---
+    # Select all matching sections and take the one WITHOUT an id (responsibilities)
+    responsibility_section = None
+    for section in SECTION_SELECTOR.select(soup):
+        if not section.has_attr("id"):  # The responsibilities section has no ID
+            responsibility_section = section
+            break
+
+    responsibilities = responsibility_section.get_text(separator='\n', strip=True) if responsibility_section else ""
+
+    # --- Skills (Required + Preferred) ---
+    skills_section = SKILLS_SELECTOR.select_one(soup)
+    skills = skills_section.get_text(separator='\n', strip=True) if skills_section else ""
+
+    # --- Combine All ---
+    full_description = _combine_description(responsibilities, skills)
+    if not full_description and job_id:
+        # Server HTML may not contain the rendered sections, but the page data usually ships as JSON
+        full_description = _parse_embedded_json_description(html, job_id)
+    _record_parse("job_detail", time.perf_counter() - start, len(html))
+    return full_description
@@ -0,0 +1,98 @@
+# job_cache.py
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+class DescriptionCache:
+    """
+    SQLite store of Jobright job id -> description, fetch timestamp and content hash.
+    Entries older than `ttl_seconds` are treated as missing, and the oldest entries
+    are evicted once the cache holds more than `max_entries` or `max_bytes`.
+    """
+
+    EVICT_EVERY = 50 # Puts between eviction passes
+
+    def __init__(self, db_path, ttl_seconds=7 * 24 * 3600, max_entries=20000, max_bytes=200 * 1024 * 1024):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._puts_since_evict = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_descriptions (
+                job_id TEXT PRIMARY KEY,
+                description TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                content_hash TEXT NOT NULL,
+                size INTEGER NOT NULL
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_job_descriptions_fetched_at ON job_descriptions (fetched_at)")
+        self._conn.commit()
+        self.evict()
+
+    def get(self, job_id):
+        """Returns the cached description for `job_id`, or None if missing or expired."""
+        if not job_id:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT description, fetched_at FROM job_descriptions WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if row and time.time() - row[1] < self.ttl_seconds:
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, job_id, description):
+        """Stores a freshly fetched description."""
+        if not job_id or not description:
+            return
+        data = description.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_descriptions (job_id, description, fetched_at, content_hash, size) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (job_id, description, time.time(), content_hash, len(data)),
+            )
+            self._conn.commit()
+            self._puts_since_evict += 1
+            if self._puts_since_evict < self.EVICT_EVERY:
+                return
+        self.evict()
+
+    def evict(self):
+        """Drops expired entries, then the oldest entries beyond the size limits."""
+        with self._lock:
+            self._puts_since_evict = 0
+            self._conn.execute("DELETE FROM job_descriptions WHERE fetched_at < ?", (time.time() - self.ttl_seconds,))
+            count, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM job_descriptions"
+            ).fetchone()
+            if count > self.max_entries or total_bytes > self.max_bytes:
+                doomed = []
+                for job_id, size in self._conn.execute("SELECT job_id, size FROM job_descriptions ORDER BY fetched_at"):
+                    if count <= self.max_entries and total_bytes <= self.max_bytes:
+                        break
+                    doomed.append((job_id,))
+                    count -= 1
+                    total_bytes -= size
+                self._conn.executemany("DELETE FROM job_descriptions WHERE job_id = ?", doomed)
+            self._conn.commit()
+
+    def close(self):
+        self.evict()
+        with self._lock:
+            self._conn.close()
+        print(f"Description cache: {self.hits} hits, {self.misses} misses.")
@@ -0,0 +1,87 @@
+# job_index.py
+import os
+import sqlite3
+import threading
+
+
+def normalize_job_key(company_name, role_title):
+    """Returns a (company, title) key that ignores case and whitespace differences."""
+    return (" ".join((company_name or "").split()).casefold(),
+            " ".join((role_title or "").split()).casefold())
+
+
+class JobIndex:
+    """
+    Persistent index of jobs that have already been processed, keyed by Jobright
+    job id and by normalized (company, title). Used to drop known job cards
+    before any description is fetched.
+    """
+
+    def __init__(self, db_path):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS known_jobs (
+                job_id TEXT,
+                company_key TEXT NOT NULL,
+                title_key TEXT NOT NULL
+            )""")
+        self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_known_jobs_id ON known_jobs (job_id)")
+        self._conn.commit()
+
+        # Both lookups are served from memory; SQLite only persists additions
+        self.job_ids = set()
+        self.job_keys = set()
+        for job_id, company_key, title_key in self._conn.execute("SELECT job_id, company_key, title_key FROM known_jobs"):
+            if job_id:
+                self.job_ids.add(job_id)
+            self.job_keys.add((company_key, title_key))
+        # Jobs already seen during this run, so repeated cards are dropped too
+        self._run_ids = set()
+        self._run_keys = set()
+
+    def add_keys(self, job_keys):
+        """Merges (company, title) pairs known from elsewhere (e.g. the Google Sheet) for this run."""
+        self.job_keys.update(normalize_job_key(company, title) for company, title in job_keys)
+
+    def is_known(self, job):
+        return (job.get("job_id") in self.job_ids
+                or normalize_job_key(job.get("company"), job.get("title")) in self.job_keys)
+
+    def add(self, job):
+        """Records a processed job so later runs skip it."""
+        self.add_many([job])
+
+    def add_many(self, jobs):
+        """Records several processed jobs in one transaction."""
+        rows = []
+        for job in jobs:
+            company_key, title_key = normalize_job_key(job.get("company"), job.get("title"))
+            rows.append((job.get("job_id"), company_key, title_key))
+        with self._lock:
+            for job_id, company_key, title_key in rows:
+                if job_id:
+                    self.job_ids.add(job_id)
+                self.job_keys.add((company_key, title_key))
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO known_jobs (job_id, company_key, title_key) VALUES (?, ?, ?)", rows)
+
+    def claim(self, job):
+        """Returns True if the job is new, i.e. neither known nor already claimed during this run."""
+        job_key = normalize_job_key(job.get("company"), job.get("title"))
+        job_id = job.get("job_id")
+        with self._lock:
+            if self.is_known(job) or job_id in self._run_ids or job_key in self._run_keys:
+                return False
+            if job_id:
+                self._run_ids.add(job_id)
+            self._run_keys.add(job_key)
+            return True
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
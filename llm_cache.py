@@ -0,0 +1,78 @@
+# llm_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def make_cache_key(*parts):
+    """Hashes the JSON-serializable parts that fully determine a model response."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent LLM response cache (SQLite) with least-recently-used eviction once
+    more than `max_entries` responses are stored. Counts hits and misses.
+    """
+
+    def __init__(self, db_path, max_entries=5000):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                cache_key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)")
+        self._conn.commit()
+
+    def get(self, cache_key):
+        """Returns the cached response, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE cache_key = ?", (cache_key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE cache_key = ?", (time.time(), cache_key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, cache_key, response):
+        """Stores a response, evicting the least recently used entries beyond max_entries."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (cache_key, response, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (cache_key, response, now, now),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE cache_key IN "
+                    "(SELECT cache_key FROM responses ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._conn.commit()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        print(f"Gemini response cache: {self.hits} hits, {self.misses} misses.")
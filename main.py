@@ -1,27 +1,30 @@
 # main.py
-import time
 import os
 from datetime import datetime
+from itertools import chain
 
-from config_loader import load_config, load_base_resume_info
-from web_scraper import setup_driver, scrape_jobright_listings, get_job_description
-from ai_interaction import configure_gemini, generate_resume_content, generate_cover_letter
-# from document_handler import save_text_to_file, find_latest_resume_pdf, rename_resume
+from config_loader import load_config
+from resume_parser import load_resume_sections
+from web_scraper import setup_driver, export_session_cookies
+from crawl_scheduler import CrawlScheduler
+from session_store import login_with_saved_session
+from fetch_pool import FetchPool
+from job_cache import DescriptionCache
+from job_index import JobIndex, normalize_job_key
+from run_journal import RunJournal
+from relevance import RelevanceScorer
+from pipeline import Pipeline, Stage
+from adaptive_wait import get_latency_percentiles
+from html_parsing import get_parse_stats
+from ai_interaction import (configure_gemini, configure_rate_limit, configure_response_cache,
+                            get_model_timing_stats, GenerationPool, GeminiResult)
+from llm_cache import ResponseCache
+import metrics
+from document_handler import save_text_to_file # , find_latest_resume_pdf, rename_resume
+from document_store import DocumentStore
+from resume_renderer import ResumeRenderPool
 # from browser_automation import fill_application_form
-from sheets_logger import setup_sheets_client, log_application, log_job_info, get_existing_jobs
-
-# --- Configuration ---
-try:
-    config = load_config() # Loads all config including jobright credentials
-    base_resume_info = load_base_resume_info(config["base_resume_info_file"])
-    print(base_resume_info)
-    configure_gemini(config["gemini_api_key"])
-    sheets_client = setup_sheets_client(config["service_account_file"])
-    existing_jobs = get_existing_jobs(sheets_client,config["google_sheet_id"])
-except (ValueError, FileNotFoundError, Exception) as e:
-    print(f"Critical setup error: {e}")
-    print("Exiting.")
-    exit()
+from sheets_logger import setup_sheets_client, log_application, log_job_info, get_existing_jobs, SheetWriter
 
 # --- User Data (for filling forms) ---
 USER_DATA = {
@@ -34,120 +37,388 @@ USER_DATA = {
 YOUR_NAME_FOR_FILENAME = "YourName"
 
 
+def render_tailored_resume(job, resume_text, pdf_path, render_pool, document_store):
+    """Queues the tailored resume PDF for rendering; it is archived once written. Returns the Future."""
+    def on_done(future):
+        try:
+            path = future.result()
+            with open(path, 'rb') as f:
+                document_store.save(job['job_id'], job['company'], job['title'], "resume_pdf", f.read(),
+                                    file_name=os.path.basename(path))
+            print(f"Rendered tailored resume: {path}")
+        except Exception as e:
+            print(f"Error rendering resume PDF for {job['title']} at {job['company']}: {e}")
+
+    future = render_pool.submit(resume_text, pdf_path)
+    future.add_done_callback(on_done)
+    return future
+
+def handle_generated_documents(job, resume_result, cover_letter_result, output_dir, document_store, render_pool=None,
+                               save_cover_letter_file=True):
+    """
+    Shows the generated resume content, renders the tailored resume PDF and archives the documents for one job.
+    Returns the Future of the resume PDF render (None if no PDF is rendered).
+    """
+    print(f"\n=== Generated documents for {job['title']} at {job['company']} ===")
+    safe_company = "".join(c for c in job['company'] if c.isalnum() or c in (' ', '_')).rstrip()
+    safe_role = "".join(c for c in job['title'] if c.isalnum() or c in (' ', '_')).rstrip()
+    resume_pdf_future = None
+    if resume_result.ok:
+        print("\n--- Suggested Resume Bullet Points ---")
+        print(resume_result.text)
+        print("---------------------------------------------------------")
+        document_store.save(job['job_id'], job['company'], job['title'], "resume_content", resume_result.text)
+        # 4. Render the tailored resume PDF locally (replaces the manual Overleaf update and download)
+        if render_pool:
+            resume_pdf_path = os.path.join(output_dir, f"{YOUR_NAME_FOR_FILENAME}_Resume_{safe_company}_{safe_role}.pdf")
+            resume_pdf_future = render_tailored_resume(job, resume_result.text, resume_pdf_path, render_pool, document_store)
+    else:
+        print(f"Resume content generation failed: {resume_result.error}")
+
+    if not cover_letter_result.ok:
+        print(f"Cover letter generation failed: {cover_letter_result.error}")
+        return resume_pdf_future
+    cover_letter_text = cover_letter_result.text
+    print("\n--- Generated Cover Letter Text (Preview) ---")
+    print(cover_letter_text[:500] + "..." if len(cover_letter_text) > 500 else cover_letter_text)
+    print("---------------------------------------------")
+
+    # --- Document Handling ---
+    # 7. Save Cover Letter to file
+    cl_filename = os.path.join(output_dir, f"CoverLetter_{safe_company}_{safe_role}.txt")
+    content_hash, is_new = document_store.save(job['job_id'], job['company'], job['title'], "cover_letter",
+                                               cover_letter_text, file_name=os.path.basename(cl_filename))
+    # Identical letters already saved for this job are not written again; nor lost if archiving failed
+    if save_cover_letter_file and (is_new or content_hash is None):
+        save_text_to_file(cover_letter_text, cl_filename)
+
+    # # 5. Wait for the rendered resume PDF (only needed by the application step)
+    # renamed_resume_path = resume_pdf_future.result() if resume_pdf_future else None
+    # if not renamed_resume_path:
+    #      print("No rendered resume PDF. Skipping application step.")
+    #      return
+
+    # # --- Application Step ---
+    # # 8. Apply Online (Attempt)
+    # application_link = job['url'] # Still assuming job['url'] is the apply link
+    # print(f"\nApplication Link: {application_link}")
+
+    # apply_attempt = input("Attempt to automatically fill the application form? (yes/no): ").lower()
+    # submission_attempted = False
+    # if apply_attempt == 'yes':
+    #      if application_link:
+    #           # Pass the existing driver instance to the application function
+    #           submission_attempted = fill_application_form(driver, application_link, renamed_resume_path, cl_filename, USER_DATA)
+    #      else:
+    #           print("Cannot attempt application, no valid link found.")
+    # else:
+    #     print("Skipping automated form filling.")
+
+    # 9. Log to Google Sheets
+    # print("\nLogging application attempt to Google Sheets...")
+    # log_application(sheet_writer, job['company'], job['title'])
+    return resume_pdf_future
+
+
+def restore_journal_job(job):
+    """Turns the generated results saved in the run journal back into GeminiResults."""
+    for key in ("resume_result", "cover_letter_result"):
+        if isinstance(job.get(key), dict):
+            job[key] = GeminiResult(**job[key])
+    return job
+
+def _hit_rate(hits, misses):
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": round(hits / total, 4) if total else 0.0}
+
+def write_run_metrics(metrics_dir, run_stats, pipeline, description_cache, response_cache):
+    """Writes per-stage timings, counters and cache hit rates for this run to a JSON file."""
+    extra = {
+        "jobs_processed": run_stats["processed"],
+        "page_waits": get_latency_percentiles(),
+        "html_parsing": get_parse_stats(),
+        "gemini_models": get_model_timing_stats(),
+        "cache_hit_rates": {},
+    }
+    if pipeline:
+        extra["pipeline"] = {stage.name: {"processed": stage.processed, "emitted": stage.emitted, "errors": stage.errors}
+                             for stage in pipeline.stages}
+    if description_cache:
+        extra["cache_hit_rates"]["job_descriptions"] = _hit_rate(description_cache.hits, description_cache.misses)
+    if response_cache:
+        extra["cache_hit_rates"]["gemini_responses"] = _hit_rate(response_cache.hits, response_cache.misses)
+    metrics.write_report(metrics_dir, extra)
+
+
 def main():
+    # --- Configuration ---
+    # Loaded here rather than at import time, so resume render worker processes never run it
+    try:
+        config = load_config() # Loads all config including jobright credentials
+        # Parsed once and cached; prompts get only the sections relevant to each job
+        resume_sections = load_resume_sections(config["base_resume_info_file"], cache_dir=config["data_dir"])
+        print(f"Loaded base resume ({len(resume_sections['full_text'])} characters).")
+        configure_gemini(config["gemini_api_key"])
+        configure_rate_limit(config["gemini_requests_per_minute"])
+        sheets_client = setup_sheets_client(config["service_account_file"])
+        existing_jobs = get_existing_jobs(sheets_client, config["google_sheet_id"],
+                                          snapshot_file=os.path.join(config["data_dir"], "existing_jobs_snapshot.json"))
+    except (ValueError, FileNotFoundError, Exception) as e:
+        print(f"Critical setup error: {e}")
+        print("Exiting.")
+        return
+
     driver = None
+    fetch_pool = None
+    crawl_scheduler = None
+    description_cache = None
+    job_index = None
+    sheet_writer = None
+    generation_pool = None
+    response_cache = None
+    run_journal = None
+    document_store = None
+    render_pool = None
+    relevance_scorer = None
+    pipeline = None
+    metrics_dir = os.path.join(config["data_dir"], "metrics")
+    job_profiler = metrics.JobProfiler(os.path.join(metrics_dir, "job_profile.pstats")) if config["profile_job"] else None
+    run_stats = {"processed": 0}
     try:
-        driver = setup_driver()
+        if config["generate_documents"] and config["render_resumes"]:
+            # Started first: worker processes are forked before any pipeline threads exist
+            render_pool = ResumeRenderPool(resume_sections, workers=config["resume_render_workers"],
+                                           template_file=config["resume_template_file"])
+
+        driver_settings = {
+            "headless": config["browser_headless"],
+            "block_resources": config["block_browser_resources"],
+            "driver_path_cache": os.path.join(config["data_dir"], "chromedriver_path.txt"),
+        }
+        driver = setup_driver(**driver_settings)
         if not driver:
             return
 
-        # 1. Login to Jobright and Check for openings
-        print("Logging into Jobright and searching for jobs...")
-        job_listings = scrape_jobright_listings(
-            driver,
-            username=config["jobright_username"], # Pass username
-            password=config["jobright_password"], # Pass password
-            search_url="https://jobright.ai/jobs/recommend?login=true" # Example Search
-        )
-
-        if not job_listings:
-            print("No job listings found or login failed.")
+        # 1. Login to Jobright (reusing the encrypted session from the last run while it is valid)
+        print("Logging into Jobright...")
+        if not login_with_saved_session(driver, config["jobright_username"], config["jobright_password"],
+                                        os.path.join(config["data_dir"], "jobright_session.bin")):
+            print("Login failed. Cannot proceed to scrape job listings.")
             # Driver is closed in finally block
             return
 
-        print(f"\nFound {len(job_listings)} jobs after login. Processing...")
-
-        processed_jobs_count = 0
         output_dir = "generated_documents"
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
+        # Every generated document is archived by job id, company and role; identical content is stored once
+        document_store = DocumentStore(os.path.join(output_dir, "documents.sqlite3"))
 
+        # Jobs already processed (by job id or company/title) are dropped before paying for any page load
+        job_index = JobIndex(os.path.join(config["data_dir"], "job_index.sqlite3"))
+        job_index.add_keys(existing_jobs)
+        # Jobs left unfinished by an earlier (crashed) run continue from their last completed stage
+        run_journal = RunJournal(os.path.join(config["data_dir"], "run_journal.sqlite3"),
+                                 batch_size=config["journal_batch_size"], max_attempts=config["journal_max_attempts"])
+        resumed_jobs = [restore_journal_job(job) for job in run_journal.unfinished()]
+        if resumed_jobs:
+            print(f"Resuming {len(resumed_jobs)} unfinished jobs from the last run.")
+        # Term frequencies of every title and skills text scored so far weight the relevance scores
+        relevance_scorer = RelevanceScorer(resume_sections["full_text"],
+                                           stats_file=os.path.join(config["data_dir"], "relevance_stats.json"))
 
-        for job in job_listings:
-            print(f"\n--- Processing Job: {job['title']} at {job['company']} ---")
+        def rows_written(jobs):
+            # Only jobs whose rows are in the sheet count as done; buffered rows lost in a crash are redone
+            job_index.add_many(jobs)
+            for job in jobs:
+                run_journal.record(job, "logged")
+
+        # Sheet rows are buffered and written in batches
+        sheet_writer = SheetWriter(
+            sheets_client,
+            config["google_sheet_id"],
+            max_rows=config["sheets_batch_size"],
+            max_age_seconds=config["sheets_flush_seconds"],
+            pending_file=os.path.join(config["data_dir"], "unsent_sheet_rows.jsonl"),
+            on_written=rows_written,
+        )
+        # Rows re-queued from the last run are not in the sheet yet, but must not be logged twice
+        unsent_keys = [(row[0], row[1]) for row in sheet_writer.queued_rows() if len(row) >= 2]
+        job_index.add_keys(unsent_keys)
+        existing_jobs.update(normalize_job_key(company, title) for company, title in unsent_keys)
+
+        # Gemini generation runs alongside description fetching when enabled
+        if config["generate_documents"]:
+            # Identical prompts from earlier runs are answered locally without using API quota
+            response_cache = ResponseCache(os.path.join(config["data_dir"], "gemini_responses.sqlite3"),
+                                           max_entries=config["response_cache_max_entries"])
+            configure_response_cache(response_cache)
+            generation_pool = GenerationPool(resume_sections, max_concurrency=config["gemini_concurrency"],
+                                             batch_size=config["generation_batch_size"])
+
+        # Descriptions fetched by earlier runs are served from the local cache until they expire
+        description_cache = DescriptionCache(
+            os.path.join(config["data_dir"], "job_descriptions.sqlite3"),
+            ttl_seconds=config["description_cache_ttl_hours"] * 3600,
+            max_entries=config["description_cache_max_entries"],
+        )
+        # Extra browser sessions reuse the login cookies. The logged-in driver keeps
+        # scrolling the listings, so it is not shared with the pool.
+        fetch_pool = FetchPool(
+            export_session_cookies(driver),
+            workers=config["fetch_workers"],
+            per_domain_limit=config["fetch_per_domain_limit"],
+            rate_per_second=config["fetch_rate_limit"],
+            http_fast_path=config["http_fast_path"],
+            cache=description_cache,
+            driver_settings=driver_settings,
+        )
+
+        # --- Pipeline stages: list -> dedupe -> fetch description -> score -> generate -> log ---
+        resumed_ids = set(job["job_id"] for job in resumed_jobs)
 
-            # 2. Get Job Description
-            # We use the same driver instance, session should persist
-            
-            job_description = get_job_description(driver, job['url'])
+        def dedupe(job, emit):
+            if not job_index.claim(job):
+                print(f"Skipping already known job: {job['title']} at {job['company']}")
+                if job["job_id"] in resumed_ids and job_index.is_known(job):
+                    run_journal.record(job, "skipped") # Logged before the journal recorded it
+                return
+            # Score the listing title against the resume before fetching any description
+            if not relevance_scorer.filter_by_title([job], config["title_relevance_threshold"]):
+                print(f"Skipping unrelated title ({job['title_score']:.2f}): {job['title']} at {job['company']}")
+                run_journal.record(job, "skipped") # Lets the search cursor move past it
+                return
+            if not job.get("description"):
+                run_journal.record(job, "listed")
+            emit(job)
+
+        def fetch_description(job, emit):
+            if job.get("description"):
+                emit(job) # Fetched by an earlier run
+                return
+            job, job_description = fetch_pool.fetch(job)
             if not job_description or "Error fetching description" in job_description or "Description not found" in job_description :
-                 print("Could not get job description. Skipping job.")
-                 continue
-            
-            print("\nLogging Job Information attempt to Google Sheets...")
-            log_job_info(sheets_client, existing_jobs, config["google_sheet_id"], job['company'], job['title'], job_description, job['url'])
-
-            # # --- AI Generation ---
-            # # 3. Prompt AI for Tailored Resume Content
-            # print("\nGenerating tailored resume content...")
-            # resume_bullet_points = generate_resume_content(job_description, base_resume_info)
-            # print("\n--- Suggested Resume Bullet Points (Copy to Overleaf) ---")
-            # print(resume_bullet_points)
-            # print("---------------------------------------------------------")
-
-            # # 6. Prompt AI for Cover Letter
-            # print("\nGenerating cover letter...")
-            # cover_letter_text = generate_cover_letter(job_description, base_resume_info, job['company'], job['title'])
-            # print("\n--- Generated Cover Letter Text (Preview) ---")
-            # print(cover_letter_text[:500] + "..." if len(cover_letter_text) > 500 else cover_letter_text)
-            # print("---------------------------------------------")
-
-            # # --- Document Handling ---
-            # # 7. Save Cover Letter to file
-            # safe_company = "".join(c for c in job['company'] if c.isalnum() or c in (' ', '_')).rstrip()
-            # safe_role = "".join(c for c in job['title'] if c.isalnum() or c in (' ', '_')).rstrip()
-            # cl_filename = os.path.join(output_dir, f"CoverLetter_{safe_company}_{safe_role}.txt")
-            # save_text_to_file(cover_letter_text, cl_filename)
-
-            # # 4. MANUAL STEP: Update Resume on Overleaf & Download
-            # print("\n--- ACTION REQUIRED ---")
-            # print("1. Copy the generated resume bullet points above.")
-            # print("2. Paste them into your resume project on Overleaf.")
-            # print("3. Recompile your resume on Overleaf.")
-            # print(f"4. Download the updated PDF resume to your '{config['downloads_folder']}' folder.")
-            # input("Press Enter when you have downloaded the updated resume PDF...")
-
-            # # 5. Find and Rename Downloaded Resume
-            # latest_resume_path = find_latest_resume_pdf(config["downloads_folder"])
-            # if not latest_resume_path:
-            #      print("Could not find the downloaded resume PDF. Skipping application step.")
-            #      continue
-
-            # renamed_resume_path = rename_resume(latest_resume_path, job['company'], job['title'], output_dir, YOUR_NAME_FOR_FILENAME)
-            # if not renamed_resume_path:
-            #      print("Failed to rename the resume PDF. Using original path for application attempt.")
-            #      renamed_resume_path = latest_resume_path
-
-            # # --- Application Step ---
-            # # 8. Apply Online (Attempt)
-            # application_link = job['url'] # Still assuming job['url'] is the apply link
-            # print(f"\nApplication Link: {application_link}")
-
-            # apply_attempt = input("Attempt to automatically fill the application form? (yes/no): ").lower()
-            # submission_attempted = False
-            # if apply_attempt == 'yes':
-            #      if application_link:
-            #           # Pass the existing driver instance to the application function
-            #           submission_attempted = fill_application_form(driver, application_link, renamed_resume_path, cl_filename, USER_DATA)
-            #      else:
-            #           print("Cannot attempt application, no valid link found.")
-            # else:
-            #     print("Skipping automated form filling.")
-
-            # 9. Log to Google Sheets
-            # print("\nLogging application attempt to Google Sheets...")
-            # log_application(sheets_client, config["google_sheet_id"], job['company'], job['title'])
-
-            processed_jobs_count += 1
+                 print(f"Could not get job description for {job['title']} at {job['company']}. Skipping job.")
+                 run_journal.record_failure(job, "described", job_description or "No description")
+                 return
+            job["description"] = job_description
+            run_journal.record(job, "described")
+            emit(job)
+
+        def score(job, emit):
+            job["skills_score"] = relevance_scorer.score_skills(job["description"])
+            emit(job)
+
+        def attach_generated(emit, job_done, resume_result, cover_letter_result):
+            # Runs on a generation thread as soon as the job's documents are ready
+            if not (resume_result.ok and cover_letter_result.ok):
+                # Not logged (nor added to the job index), so the next run generates it again
+                error = resume_result.error if not resume_result.ok else cover_letter_result.error
+                print(f"Document generation failed for {job_done['title']} at {job_done['company']}; retrying next run.")
+                run_journal.record_failure(job_done, "generated", error)
+                return
+            job_done["resume_result"] = resume_result
+            job_done["cover_letter_result"] = cover_letter_result
+            run_journal.record(job_done, "generated")
+            emit(job_done)
+
+        def generate(job, emit):
+            # 3. Generate tailored resume content and cover letter in the background
+            if not generation_pool or "resume_result" in job:
+                emit(job)
+                return
+            if job["skills_score"] < config["skills_relevance_threshold"]:
+                print(f"Skills match {job['skills_score']:.2f} is below the threshold. Skipping document generation.")
+                emit(job)
+                return
+            # Blocks while enough jobs are already being generated
+            generation_pool.submit(job, job["description"], lambda *generated: attach_generated(emit, *generated))
+
+        def finish_generation(emit):
+            if generation_pool:
+                print("\nWaiting for remaining document generation to finish...")
+                generation_pool.join()
+
+        def log(job, emit):
+            print(f"\n--- Processing Job: {job['title']} at {job['company']} ---")
+            print("Logging Job Information attempt to Google Sheets...")
+            if not log_job_info(sheet_writer, existing_jobs, job['company'], job['title'], job['description'], job['url'],
+                                item=job):
+                run_journal.record(job, "logged") # Already in the sheet
+            if "resume_result" in job:
+                handle_generated_documents(job, job["resume_result"], job["cover_letter_result"], output_dir, document_store,
+                                           render_pool, save_cover_letter_file=config["save_cover_letter_files"])
+            run_stats["processed"] += 1
             print(f"--- Finished processing {job['title']} ---")
-            time.sleep(5) # Slightly shorter delay between jobs maybe
-            # break # For Debugging
+
+        def profiled(process):
+            # The first job to reach a profiled stage is followed through the rest of them
+            if not job_profiler:
+                return process
+            return lambda job, emit: job_profiler.profile(job, process, job, emit)
+
+        pipeline = Pipeline([
+            Stage("dedupe", dedupe),
+            Stage("fetch", profiled(fetch_description), workers=config["fetch_workers"]),
+            Stage("score", profiled(score)),
+            Stage("generate", profiled(generate), on_close=finish_generation),
+            Stage("log", profiled(log)),
+        ])
+        # 2. Scrape listings from every search; jobs flow downstream while lists are still scrolling
+        crawl_scheduler = CrawlScheduler(
+            config["search_urls"],
+            export_session_cookies(driver),
+            os.path.join(config["data_dir"], "crawl_cursors.json"),
+            workers=config["crawl_workers"],
+            seed_driver=driver,
+            driver_settings=driver_settings,
+            # Cursors only move past jobs that a later run would not need to list again
+            is_settled=lambda job: job_index.is_known(job) or run_journal.is_recorded(job["job_id"]),
+        )
+        pipeline.run(chain(resumed_jobs, crawl_scheduler.crawl()))
+        print(f"\nProcessed {run_stats['processed']} new jobs.")
+        for page_type, latency in get_latency_percentiles().items():
+            print(f"Page wait '{page_type}': p50 {latency['p50']:.2f}s, p95 {latency['p95']:.2f}s over {latency['count']} loads.")
+        for page_type, parse in get_parse_stats().items():
+            print(f"HTML parse '{page_type}': {parse['count']} pages, avg {parse['seconds'] / parse['count'] * 1000:.1f}ms, "
+                  f"max {parse['max_seconds'] * 1000:.1f}ms.")
+
+        if generation_pool:
+            timings = get_model_timing_stats()
+            print(f"Gemini: {timings['models_created']} models set up in {timings['setup_seconds']:.2f}s, "
+                  f"{timings['calls']} calls took {timings['inference_seconds']:.2f}s.")
 
     except Exception as e:
         print(f"\nAn error occurred during the main process: {e}")
         import traceback # Optional: Print full traceback for debugging
         traceback.print_exc()
     finally:
+        if generation_pool:
+            generation_pool.close()
+        if render_pool:
+            render_pool.close() # Waits for queued resumes, which are archived in the document store
+        write_run_metrics(metrics_dir, run_stats, pipeline, description_cache, response_cache)
+        if job_profiler:
+            job_profiler.save()
+        if relevance_scorer:
+            relevance_scorer.save()
+        if response_cache:
+            configure_response_cache(None)
+            response_cache.close()
+        if sheet_writer:
+            sheet_writer.close()
+        if fetch_pool:
+            fetch_pool.close()
+        if crawl_scheduler:
+            if run_journal:
+                run_journal.flush() # Cursors are advanced from the committed journal
+            crawl_scheduler.close()
+        if description_cache:
+            description_cache.close()
+        if run_journal:
+            run_journal.close()
+        if document_store:
+            document_store.close()
+        if job_index:
+            job_index.close()
         if driver:
             print("Closing browser...")
             driver.quit()
@@ -0,0 +1,122 @@
+# metrics.py
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+MAX_SAMPLES = 10000 # Per stage; older samples are dropped for percentiles (totals stay exact)
+
+_lock = threading.Lock()
+_timings = {}
+_counters = {}
+
+
+def record_time(stage, seconds):
+    with _lock:
+        stats = _timings.get(stage)
+        if stats is None:
+            stats = _timings[stage] = {"count": 0, "total": 0.0, "max": 0.0, "samples": []}
+        stats["count"] += 1
+        stats["total"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+        stats["samples"].append(seconds)
+        if len(stats["samples"]) > MAX_SAMPLES:
+            del stats["samples"][:len(stats["samples"]) - MAX_SAMPLES]
+
+@contextmanager
+def timed(stage):
+    """Times the enclosed block under `stage` (recorded even if it raises)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_time(stage, time.perf_counter() - start)
+
+def incr(counter, amount=1):
+    with _lock:
+        _counters[counter] = _counters.get(counter, 0) + amount
+
+def _percentile(ordered, percent):
+    return ordered[min(len(ordered) - 1, int(round(percent / 100.0 * (len(ordered) - 1))))]
+
+def snapshot():
+    """Returns {"stages": {stage: {count, total_seconds, p50, p95, max}}, "counters": {...}}."""
+    with _lock:
+        stages = {}
+        for stage, stats in _timings.items():
+            ordered = sorted(stats["samples"])
+            stages[stage] = {
+                "count": stats["count"],
+                "total_seconds": round(stats["total"], 4),
+                "p50": round(_percentile(ordered, 50), 4),
+                "p95": round(_percentile(ordered, 95), 4),
+                "max": round(stats["max"], 4),
+            }
+        return {"stages": stages, "counters": dict(_counters)}
+
+def reset():
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+
+def write_report(metrics_dir, extra=None):
+    """Writes the run's metrics (plus `extra`, e.g. cache hit rates) to a timestamped JSON file."""
+    report = snapshot()
+    report["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    report.update(extra or {})
+    try:
+        os.makedirs(metrics_dir, exist_ok=True)
+        report_file = os.path.join(metrics_dir, f"run_{datetime.now():%Y%m%d_%H%M%S}.json")
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Run metrics written to {report_file}")
+        return report_file
+    except Exception as e:
+        print(f"Error writing run metrics: {e}")
+        return None
+
+
+class JobProfiler:
+    """
+    Optional cProfile hook covering a single job: the first job to reach
+    `profile()` is followed through every pipeline stage, and the combined
+    profile is written to `output_file` by save().
+    """
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.job_id = None
+        self._profiles = []
+        self._lock = threading.Lock()
+
+    def profile(self, job, func, *args):
+        """Runs func(*args), under cProfile if `job` is the profiled job."""
+        with self._lock:
+            if self.job_id is None:
+                self.job_id = job.get("job_id")
+            profiled = job.get("job_id") == self.job_id
+        if not profiled:
+            return func(*args)
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args)
+        finally:
+            with self._lock:
+                self._profiles.append(profiler)
+
+    def save(self):
+        with self._lock:
+            if not self._profiles:
+                return
+            stats = pstats.Stats(self._profiles[0])
+            for profiler in self._profiles[1:]:
+                stats.add(profiler)
+        directory = os.path.dirname(self.output_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        stats.dump_stats(self.output_file)
+        print(f"Profile of job {self.job_id} written to {self.output_file} (view with: python -m pstats {self.output_file})")
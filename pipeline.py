@@ -0,0 +1,117 @@
+# pipeline.py
+import queue
+import threading
+import time
+
+import metrics
+
+_DONE = object() # End-of-stream marker passed from stage to stage
+
+
+class Stage:
+    """
+    One step of a Pipeline. `process(item, emit)` handles an input item and calls
+    `emit(output)` for each item to pass on (zero or more). `on_close(emit)` runs
+    once after the last input item, e.g. to flush buffered work.
+    """
+
+    def __init__(self, name, process, workers=1, on_close=None, queue_size=50):
+        self.name = name
+        self.process = process
+        self.workers = max(1, workers)
+        self.on_close = on_close
+        self.input = queue.Queue(maxsize=queue_size) # Bounded, so a slow stage pushes back on earlier ones
+        self.output = None
+        self.processed = 0
+        self.emitted = 0
+        self.errors = 0
+        self._active_workers = self.workers
+        self._lock = threading.Lock()
+
+    def emit(self, item):
+        with self._lock:
+            self.emitted += 1
+        if self.output is not None:
+            self.output.put(item)
+
+    def _run(self):
+        while True:
+            item = self.input.get()
+            if item is _DONE:
+                self.input.put(_DONE) # Let sibling workers see it too
+                break
+            try:
+                with metrics.timed(f"stage:{self.name}"):
+                    self.process(item, self.emit)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                print(f"[{self.name}] Error processing item: {e}")
+            with self._lock:
+                self.processed += 1
+
+        with self._lock:
+            self._active_workers -= 1
+            last_worker = self._active_workers == 0
+        if last_worker:
+            if self.on_close:
+                try:
+                    self.on_close(self.emit)
+                except Exception as e:
+                    print(f"[{self.name}] Error while closing stage: {e}")
+            if self.output is not None:
+                self.output.put(_DONE)
+
+
+class Pipeline:
+    """
+    Runs stages connected by bounded queues, each on its own worker threads. Items
+    from the source flow through as soon as they are produced, and queue depths
+    are reported every `report_interval` seconds.
+    """
+
+    def __init__(self, stages, report_interval=30):
+        self.stages = stages
+        self.report_interval = report_interval
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.output = next_stage.input
+
+    def queue_depths(self):
+        return {stage.name: stage.input.qsize() for stage in self.stages}
+
+    def report(self):
+        print("[pipeline] " + " | ".join(
+            f"{stage.name}: queued {stage.input.qsize()}, done {stage.processed}, out {stage.emitted}"
+            + (f", errors {stage.errors}" if stage.errors else "")
+            for stage in self.stages))
+
+    def _monitor(self, stop_event):
+        while not stop_event.wait(self.report_interval):
+            self.report()
+
+    def run(self, source):
+        """Feeds every item of `source` into the first stage (on the calling thread) and waits for all stages."""
+        threads = []
+        for stage in self.stages:
+            for index in range(stage.workers):
+                thread = threading.Thread(target=stage._run, name=f"{stage.name}-{index}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        stop_event = threading.Event()
+        monitor = threading.Thread(target=self._monitor, args=(stop_event,), daemon=True)
+        monitor.start()
+        start = time.monotonic()
+        try:
+            for item in source:
+                self.stages[0].input.put(item)
+        finally:
+            self.stages[0].input.put(_DONE)
+            for thread in threads:
+                thread.join()
+            stop_event.set()
+            for stage in self.stages:
+                while not stage.input.empty():
+                    stage.input.get_nowait() # Leftover end-of-stream markers
+        print(f"[pipeline] Finished in {time.monotonic() - start:.1f}s.")
+        self.report()
@@ -0,0 +1,32 @@
+# rate_limit.py
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket. acquire() blocks until enough tokens are available."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate) # Tokens added per second; <= 0 disables limiting
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Takes `tokens` from the bucket, sleeping as needed. Returns the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        tokens = min(float(tokens), self.capacity) # A request larger than the bucket would never fit
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                sleep_for = (tokens - self._tokens) / self.rate
+            time.sleep(sleep_for)
+            waited += sleep_for
@@ -0,0 +1,120 @@
+# relevance.py
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9+#]*")
+STOP_WORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the their this to we will with you your
+who what which while within without work working years year experience ability strong knowledge skills using
+""".split())
+SKILLS_MARKER = "Skills & Qualifications:"
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall((text or "").lower()) if token not in STOP_WORDS and len(token) > 1]
+
+
+class RelevanceScorer:
+    """
+    Scores job texts against the resume: the IDF-weighted share of a job's terms
+    that also appear in the resume (0 = no overlap, 1 = every term covered).
+    IDF comes from every text seen so far of the same kind ("title" or
+    "skills"), kept across runs in `stats_file`, so terms most listings share
+    (e.g. "engineer") count for less than distinctive ones no matter how many
+    jobs are scored at once. Scoring is vectorized with NumPy over the resume vocabulary.
+    """
+
+    def __init__(self, resume_text, stats_file=None):
+        vocabulary = sorted(set(tokenize(resume_text)))
+        self.vocabulary = {term: index for index, term in enumerate(vocabulary)}
+        self.stats_file = stats_file
+        self._lock = threading.Lock()
+        self._corpora = self._load_stats() # kind -> {"documents": count, "terms": {term: document frequency}}
+
+    def _load_stats(self):
+        if not self.stats_file or not os.path.exists(self.stats_file):
+            return {}
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable relevance stats {self.stats_file}: {e}")
+            return {}
+
+    def save(self):
+        """Writes the document frequencies seen so far to `stats_file`."""
+        if not self.stats_file:
+            return
+        try:
+            directory = os.path.dirname(self.stats_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._lock:
+                data = json.dumps(self._corpora)
+            temp_file = self.stats_file + ".tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_file, self.stats_file)
+        except Exception as e:
+            print(f"Error saving relevance stats: {e}")
+
+    def score_texts(self, texts, kind="title"):
+        """Returns a NumPy array with one score per text, counting the texts into the `kind` corpus first."""
+        term_sets = [set(tokenize(text)) for text in texts]
+        if not term_sets:
+            return np.zeros(0)
+
+        with self._lock:
+            corpus = self._corpora.setdefault(kind, {"documents": 0, "terms": {}})
+            corpus["documents"] += len(term_sets)
+            frequencies = corpus["terms"]
+            for terms in term_sets:
+                for term in terms:
+                    frequencies[term] = frequencies.get(term, 0) + 1
+            document_count = corpus["documents"]
+            vocabulary_frequency = np.array([frequencies.get(term, 0) for term in self.vocabulary], dtype=float)
+            # Terms unknown to the resume only ever count against a text, so their weights are summed per text
+            out_of_vocabulary = np.array([
+                sum(np.log((document_count + 1) / (frequencies[term] + 1)) + 1.0
+                    for term in terms if term not in self.vocabulary)
+                for terms in term_sets])
+
+        # Flattened (row, column) positions of in-vocabulary terms
+        rows, columns = [], []
+        for row, terms in enumerate(term_sets):
+            known = [self.vocabulary[term] for term in terms if term in self.vocabulary]
+            rows.extend([row] * len(known))
+            columns.extend(known)
+
+        presence = np.zeros((len(term_sets), max(len(self.vocabulary), 1)), dtype=bool)
+        if rows:
+            presence[np.asarray(rows), np.asarray(columns)] = True
+
+        idf = np.log((document_count + 1) / (vocabulary_frequency + 1)) + 1.0
+        if not self.vocabulary:
+            idf = np.zeros(1)
+
+        covered = presence @ idf
+        total = covered + out_of_vocabulary
+        return np.divide(covered, total, out=np.zeros(len(term_sets)), where=total > 0)
+
+    def filter_by_title(self, jobs, threshold):
+        """Returns the jobs whose title scores at least `threshold` (each job gets a "title_score")."""
+        if threshold <= 0 or not jobs:
+            return list(jobs)
+        scores = self.score_texts((job["title"] for job in jobs), kind="title")
+        kept = []
+        for job, score in zip(jobs, scores):
+            job["title_score"] = float(score)
+            if score >= threshold:
+                kept.append(job)
+        return kept
+
+    def score_skills(self, job_description):
+        """Scores the skills part of a fetched description (the whole description if it has none)."""
+        _, marker, skills = job_description.partition(SKILLS_MARKER)
+        return float(self.score_texts([skills if marker else job_description], kind="skills")[0])
@@ -0,0 +1,163 @@
+# resume_parser.py
+import hashlib
+import json
+import os
+import re
+
+import fitz
+
+FALLBACK_RESUME_TEXT = "Experienced professional seeking new opportunities."
+
+# Heading lines (case-insensitive) that start each section of the resume
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "objective"),
+    "skills": ("skills", "technical skills", "skills & tools", "core competencies"),
+    "projects": ("projects", "academic projects", "personal projects", "key projects", "project experience",
+                 "academic project experience"),
+    "experience": ("experience", "work experience", "professional experience", "employment"),
+    "education": ("education",),
+}
+BULLET_CHARS = ("•", "●", "▪", "-", "*", "–")
+WORD_PATTERN = re.compile(r"[a-z][a-z0-9+#.]*")
+DATE_RANGE_PATTERN = re.compile(r"\b(?:19|20)\d{2}\s*[-–]\s*(?:[A-Za-z]+\.?\s+)?(?:(?:19|20)\d{2}|present|current)\b",
+                                re.IGNORECASE)
+
+
+def extract_resume_text(filepath):
+    """Extracts the raw text of every page of a resume PDF."""
+    with fitz.open(filepath) as doc:
+        return "".join(page.get_text() for page in doc).strip()
+
+def split_resume_sections(text):
+    """Splits resume text into header, summary, skills, projects, experience, education and other sections."""
+    heading_to_section = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+    sections = {"header": [], "summary": [], "skills": [], "projects": [], "experience": [], "education": [], "other": []}
+    current = "header"
+    for line in text.splitlines():
+        stripped = line.strip()
+        heading = stripped.rstrip(":").lower()
+        if heading in heading_to_section:
+            current = heading_to_section[heading]
+            continue
+        if stripped:
+            sections[current].append(stripped)
+    return {name: "\n".join(lines) for name, lines in sections.items()}
+
+def _file_sha256(filepath):
+    sha = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def load_resume_sections(filepath, cache_dir=None):
+    """
+    Returns the resume split into sections plus "full_text". The parsed result is
+    cached on disk keyed by the PDF's path, mtime and hash, so the PDF is only
+    re-extracted when it changes.
+    """
+    cache_file = os.path.join(cache_dir, "resume_sections.json") if cache_dir else None
+    try:
+        mtime = os.path.getmtime(filepath)
+        cached = None
+        if cache_file and os.path.exists(cache_file):
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get("path") == os.path.abspath(filepath) and cached.get("mtime") == mtime:
+                return cached["sections"]
+
+        file_hash = _file_sha256(filepath)
+        if cached and cached.get("sha256") == file_hash:
+            sections = cached["sections"] # Touched but unchanged; only the mtime needs updating
+        else:
+            full_text = extract_resume_text(filepath)
+            sections = split_resume_sections(full_text)
+            sections["full_text"] = full_text
+
+        if cache_file:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(cache_file, 'w', encoding='utf-8') as f:
+                json.dump({"path": os.path.abspath(filepath), "mtime": mtime, "sha256": file_hash,
+                           "sections": sections}, f)
+        return sections
+    except FileNotFoundError:
+        print(f"File not found at: {filepath}")
+    except Exception as e:
+        print(f"Error reading PDF file: {e}")
+    return {"header": "", "summary": "", "skills": "", "projects": "", "experience": "", "education": "", "other": "",
+            "full_text": FALLBACK_RESUME_TEXT}
+
+def _is_entry_title(line):
+    """Short, non-bullet lines that do not end a sentence (role, company, project name)."""
+    return not line.startswith(BULLET_CHARS) and len(line) < 100 and not line.endswith((".", ","))
+
+def split_entries(section_text):
+    """
+    Splits a section into entries (a job or project with its bullet points). Each
+    date range line anchors an entry whose title is the one or two title-like
+    lines just above it; a section without dates is a single entry.
+    """
+    lines = section_text.splitlines()
+    date_lines = [index for index, line in enumerate(lines) if DATE_RANGE_PATTERN.search(line)]
+    if not date_lines:
+        return [section_text] if section_text else []
+
+    starts = []
+    lower_bound = 0
+    for date_index in date_lines:
+        start = date_index
+        while start > lower_bound and date_index - start < 2 and _is_entry_title(lines[start - 1]):
+            start -= 1
+        starts.append(start)
+        lower_bound = date_index + 1
+    starts[0] = 0 # Anything above the first entry stays with it
+    return ["\n".join(lines[start:end]) for start, end in zip(starts, starts[1:] + [len(lines)])]
+
+def _split_bullets(entry):
+    """Splits an entry into its title lines and its bullet points (wrapped lines joined to their bullet)."""
+    titles, bullets = [], []
+    for line in entry.splitlines():
+        if line.startswith(BULLET_CHARS):
+            bullets.append(line)
+        elif bullets:
+            bullets[-1] += " " + line
+        else:
+            titles.append(line)
+    return titles, bullets
+
+def build_resume_context(sections, job_description, max_entries=2, max_bullets=3):
+    """
+    Builds a compact resume text for a prompt: the header, summary, skills and education in
+    full, plus the experience/project entries that share the most words with the
+    job description (at most `max_entries` of each), each cut down to its
+    `max_bullets` most relevant bullet points.
+    """
+    if not any(sections.get(name) for name in ("skills", "projects", "experience")):
+        return sections.get("full_text", FALLBACK_RESUME_TEXT) # Headings not recognized; send everything
+
+    job_words = set(WORD_PATTERN.findall(job_description.lower()))
+
+    def relevance(entry):
+        return len(job_words.intersection(WORD_PATTERN.findall(entry.lower())))
+
+    def trim(entry):
+        titles, bullets = _split_bullets(entry)
+        kept = sorted(bullets, key=relevance, reverse=True)[:max_bullets]
+        return "\n".join(titles + [bullet for bullet in bullets if bullet in kept])
+
+    parts = []
+    if sections.get("header"):
+        parts.append(sections["header"])
+    if sections.get("summary"):
+        parts.append("Summary:\n" + sections["summary"])
+    if sections.get("skills"):
+        parts.append("Skills:\n" + sections["skills"])
+    for name, title in (("experience", "Experience"), ("projects", "Projects")):
+        entries = split_entries(sections.get(name, ""))
+        if entries:
+            ranked = sorted(entries, key=relevance, reverse=True)[:max_entries]
+            ranked.sort(key=entries.index) # Keep the resume's own order
+            parts.append(f"{title}:\n" + "\n\n".join(trim(entry) for entry in ranked))
+    if sections.get("education"):
+        parts.append("Education:\n" + sections["education"])
+    return "\n\n".join(parts)
@@ -0,0 +1,149 @@
+# resume_renderer.py
+import html
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from string import Template
+
+import fitz
+
+from resume_parser import BULLET_CHARS, split_entries
+
+# $-placeholders are filled with HTML built from the base resume sections and the generated content
+DEFAULT_TEMPLATE = """
+<div class="name">$name</div>
+<div class="contact">$contact</div>
+$summary
+$skills
+$experience
+$projects
+$education
+"""
+DEFAULT_CSS = """
+* { font-family: sans-serif; font-size: 10pt; }
+.name { font-size: 18pt; font-weight: bold; text-align: center; }
+.contact { text-align: center; color: #444444; margin-bottom: 6pt; }
+h2 { font-size: 11pt; font-weight: bold; border-bottom: 1px solid #000000; margin-top: 8pt; margin-bottom: 3pt; }
+.entry-title { font-weight: bold; margin-top: 4pt; }
+ul { margin-top: 1pt; margin-bottom: 2pt; }
+li { margin-bottom: 1pt; }
+"""
+PAGE_MARGIN = 36 # Points (0.5 inch)
+SKILLS_LINE_PATTERN = re.compile(r"^\**\s*(?:updated\s+|technical\s+)?skills\s*\**\s*:\s*\**\s*(.+)$", re.IGNORECASE)
+
+
+def _is_bullet(line):
+    return line.startswith(BULLET_CHARS) and not line.startswith("**") # "**Title**" is markdown bold
+
+def _strip_bullet(line):
+    return line.lstrip("".join(BULLET_CHARS)).strip()
+
+def _clean(line):
+    return line.replace("**", "").strip()
+
+def parse_generated_resume(text):
+    """
+    Splits generate_resume_content() output into project entries and an optional
+    skills line. Returns (projects, skills): projects is a list of
+    (title, [bullet, ...]); bullets before any title form an untitled entry.
+    """
+    projects = []
+    skills = None
+    for raw_line in (text or "").splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        skills_match = SKILLS_LINE_PATTERN.match(_clean(_strip_bullet(line)) if _is_bullet(line) else line)
+        if skills_match:
+            skills = _clean(skills_match.group(1))
+        elif _is_bullet(line):
+            if not projects:
+                projects.append(("", []))
+            projects[-1][1].append(_clean(_strip_bullet(line)))
+        else:
+            projects.append((_clean(line).rstrip(":"), []))
+    return [(title, bullets) for title, bullets in projects if title or bullets], skills
+
+def _section_html(heading, body_html):
+    return f"<h2>{html.escape(heading)}</h2>\n{body_html}" if body_html else ""
+
+def _entry_html(title_lines, bullets):
+    parts = [f'<div class="entry-title">{html.escape(line)}</div>' for line in title_lines]
+    if bullets:
+        parts.append("<ul>" + "".join(f"<li>{html.escape(bullet)}</li>" for bullet in bullets) + "</ul>")
+    return "\n".join(parts)
+
+def _base_entries_html(section_text):
+    """Renders a base resume section (experience, education) entry by entry."""
+    entries = []
+    for entry in split_entries(section_text or ""):
+        titles, bullets = [], []
+        for line in entry.splitlines():
+            if _is_bullet(line):
+                bullets.append(_strip_bullet(line))
+            elif bullets:
+                bullets[-1] += " " + line # Wrapped bullet text
+            else:
+                titles.append(line)
+        entries.append(_entry_html(titles, bullets))
+    return "\n".join(entries)
+
+def build_resume_html(sections, generated_text, template=DEFAULT_TEMPLATE):
+    """Merges the base resume sections with generated projects/skills into the HTML template."""
+    header_lines = (sections.get("header") or "").splitlines()
+    projects, generated_skills = parse_generated_resume(generated_text)
+    projects_html = "\n".join(_entry_html([title] if title else [], bullets) for title, bullets in projects)
+    skills = generated_skills or " ".join((sections.get("skills") or "").split())
+    return Template(template).safe_substitute(
+        name=html.escape(header_lines[0]) if header_lines else "",
+        contact=" | ".join(html.escape(line) for line in header_lines[1:]),
+        summary=_section_html("Summary", html.escape(sections.get("summary") or "")),
+        skills=_section_html("Skills", html.escape(skills)),
+        experience=_section_html("Experience", _base_entries_html(sections.get("experience"))),
+        projects=_section_html("Projects", projects_html or _base_entries_html(sections.get("projects"))),
+        education=_section_html("Education", _base_entries_html(sections.get("education"))),
+    )
+
+def render_resume_pdf(sections, generated_text, output_path, template=DEFAULT_TEMPLATE, css=DEFAULT_CSS):
+    """Writes a tailored resume PDF with PyMuPDF's Story layout. Returns output_path."""
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    story = fitz.Story(html=build_resume_html(sections, generated_text, template), user_css=css)
+    mediabox = fitz.paper_rect("letter")
+    where = mediabox + (PAGE_MARGIN, PAGE_MARGIN, -PAGE_MARGIN, -PAGE_MARGIN)
+    writer = fitz.DocumentWriter(output_path)
+    more = 1
+    while more: # One page per pass until the story is fully placed
+        device = writer.begin_page(mediabox)
+        more, _ = story.place(where)
+        story.draw(device)
+        writer.end_page()
+    writer.close()
+    return output_path
+
+
+class ResumeRenderPool:
+    """
+    Renders tailored resume PDFs on a pool of `workers` processes, so layout
+    work runs in parallel and off the pipeline threads. submit() returns a
+    Future resolving to the PDF path. The template (if given) is an HTML file
+    with $name, $contact, $summary, $skills, $experience, $projects and
+    $education placeholders.
+    """
+
+    def __init__(self, sections, workers=2, template_file=None):
+        self.sections = {name: text for name, text in sections.items() if name != "full_text"}
+        self.template = DEFAULT_TEMPLATE
+        if template_file:
+            with open(template_file, 'r', encoding='utf-8') as f:
+                self.template = f.read()
+        self._executor = ProcessPoolExecutor(max_workers=max(1, workers))
+        # Start the workers now, before the pipeline threads exist (forking a busy multithreaded process is unsafe)
+        self._executor.submit(os.getpid).result()
+
+    def submit(self, generated_text, output_path):
+        return self._executor.submit(render_resume_pdf, self.sections, generated_text, output_path, self.template)
+
+    def close(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
@@ -0,0 +1,127 @@
+# run_journal.py
+import dataclasses
+import json
+import os
+import sqlite3
+import threading
+import time
+
+STAGES = ("listed", "described", "generated", "logged")
+FINISHED_STAGES = ("logged", "skipped") # Jobs in these stages are never resumed
+
+
+def _encode_value(value):
+    """JSON fallback for job fields such as GeminiResult dataclasses."""
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    return str(value)
+
+
+class RunJournal:
+    """
+    Durable record of how far each job got (listed, described, generated,
+    logged, or skipped), so a run that crashes part way can be resumed:
+    unfinished() returns the saved job dicts, which already carry the results
+    of their completed stages. Updates are buffered and committed `batch_size` at a time (or once
+    the oldest is `flush_seconds` old); a hard crash can lose at most that
+    buffer, and those jobs simply repeat a stage.
+    """
+
+    def __init__(self, db_path, batch_size=25, flush_seconds=10, max_attempts=3):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._updates = []
+        self._failures = []
+        self._oldest_update_time = None
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS run_jobs (
+                job_id TEXT PRIMARY KEY,
+                stage TEXT NOT NULL,
+                job_json TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL NOT NULL
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_run_jobs_stage ON run_jobs (stage)")
+        self._conn.commit()
+
+    def record(self, job, stage):
+        """Marks `job` as having completed `stage` (one of STAGES, or "skipped")."""
+        # Finished jobs are never resumed, so their data is not kept
+        job_json = None if stage in FINISHED_STAGES else json.dumps(job, default=_encode_value)
+        with self._lock:
+            self._queue(self._updates, (job.get("job_id") or job.get("url"), stage, job_json, time.time()))
+
+    def record_failure(self, job, stage, error):
+        """Counts a failed attempt at `stage`; the job keeps its last completed stage and is retried next run."""
+        with self._lock:
+            self._queue(self._failures, (job.get("job_id") or job.get("url"), json.dumps(job, default=_encode_value),
+                                         f"{stage}: {error}", time.time()))
+
+    def _queue(self, buffer, row):
+        if not self._updates and not self._failures:
+            self._oldest_update_time = time.monotonic()
+        buffer.append(row)
+        if (len(self._updates) + len(self._failures) >= self.batch_size
+                or time.monotonic() - self._oldest_update_time >= self.flush_seconds):
+            self._flush()
+
+    def _flush(self):
+        if not self._updates and not self._failures:
+            return
+        try:
+            with self._conn: # One transaction per batch
+                self._conn.executemany("""
+                    INSERT INTO run_jobs (job_id, stage, job_json, attempts, error, updated_at) VALUES (?, ?, ?, 0, NULL, ?)
+                    ON CONFLICT(job_id) DO UPDATE SET stage = excluded.stage, job_json = excluded.job_json,
+                                                      error = NULL, updated_at = excluded.updated_at""",
+                    self._updates)
+                self._conn.executemany("""
+                    INSERT INTO run_jobs (job_id, stage, job_json, attempts, error, updated_at) VALUES (?, 'listed', ?, 1, ?, ?)
+                    ON CONFLICT(job_id) DO UPDATE SET attempts = attempts + 1, error = excluded.error,
+                                                      updated_at = excluded.updated_at""",
+                    self._failures)
+        except sqlite3.Error as e:
+            print(f"Error writing run journal: {e}")
+        self._updates = []
+        self._failures = []
+        self._oldest_update_time = None
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def is_recorded(self, job_id):
+        """True if a committed entry exists for `job_id` (buffered updates are not counted until flushed)."""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM run_jobs WHERE job_id = ?", (job_id,)).fetchone() is not None
+
+    def unfinished(self):
+        """Returns the saved dicts of unfinished jobs that have failed fewer than `max_attempts` times."""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, job_json FROM run_jobs WHERE stage NOT IN (?, ?) AND attempts < ? ORDER BY updated_at",
+                (*FINISHED_STAGES, self.max_attempts)).fetchall()
+        jobs = []
+        for job_id, job_json in rows:
+            try:
+                job = json.loads(job_json)
+            except (TypeError, ValueError):
+                print(f"Skipping unreadable journal entry for job {job_id}.")
+                continue
+            jobs.append(job)
+        return jobs
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._conn.close()
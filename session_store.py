@@ -0,0 +1,122 @@
+# session_store.py
+import base64
+import json
+import os
+
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from selenium.common.exceptions import TimeoutException
+
+from adaptive_wait import wait_for, element_present
+from web_scraper import JOBRIGHT_BASE_URL, apply_session_cookies, create_http_session, login_to_jobright
+
+SALT_SIZE = 16
+KDF_ITERATIONS = 200_000
+SESSION_CHECK_URL = "https://jobright.ai/jobs/recommend"
+LOGGED_IN_SELECTOR = "div[class*='index_jobs-page']" # Same post-login indicator as login_to_jobright()
+LOGIN_PATH_MARKERS = ("login", "signin", "sign-in") # GUESS - where Jobright redirects logged-out requests
+
+
+def _fernet(secret, salt):
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=KDF_ITERATIONS)
+    return Fernet(base64.urlsafe_b64encode(kdf.derive(secret.encode("utf-8"))))
+
+def save_session(driver, session_file, secret):
+    """Saves the driver's cookies and localStorage, encrypted with a key derived from `secret`."""
+    try:
+        session = {
+            "cookies": driver.get_cookies(),
+            "local_storage": driver.execute_script("return Object.assign({}, window.localStorage);") or {},
+        }
+        salt = os.urandom(SALT_SIZE)
+        token = _fernet(secret, salt).encrypt(json.dumps(session).encode("utf-8"))
+        directory = os.path.dirname(session_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Readable by the current user only
+        fd = os.open(session_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(salt + token)
+        print(f"Saved Jobright session to {session_file}")
+        return True
+    except Exception as e:
+        print(f"Error saving Jobright session: {e}")
+        return False
+
+def load_session(session_file, secret):
+    """Returns the saved session dict, or None if there is none or it cannot be decrypted."""
+    if not os.path.exists(session_file):
+        return None
+    try:
+        with open(session_file, 'rb') as f:
+            data = f.read()
+        return json.loads(_fernet(secret, data[:SALT_SIZE]).decrypt(data[SALT_SIZE:]))
+    except InvalidToken:
+        print("Saved Jobright session could not be decrypted (password changed?). Ignoring it.")
+    except Exception as e:
+        print(f"Error loading saved Jobright session: {e}")
+    return None
+
+def check_session_http(cookies, timeout=5):
+    """
+    Checks saved cookies with one plain HTTP request instead of a browser page load.
+    Returns True (logged in), False (expired) or None when the answer is unclear.
+    """
+    try:
+        response = create_http_session(cookies).get(SESSION_CHECK_URL, timeout=timeout, allow_redirects=False)
+    except Exception as e:
+        print(f"HTTP session check failed: {e}")
+        return None
+    if response.status_code in (401, 403):
+        return False
+    if response.is_redirect:
+        location = response.headers.get("Location", "").lower()
+        return False if any(marker in location for marker in LOGIN_PATH_MARKERS) else None
+    if response.status_code != 200:
+        return None
+    return 'type="password"' not in response.text # A login form served in place of the jobs page
+
+def restore_session(driver, session, check_timeout=8):
+    """
+    Checks that a saved session is still logged in and loads it into the driver.
+    The check is a plain HTTP request; the browser only checks when that is inconclusive.
+    """
+    logged_in = check_session_http(session.get("cookies", []))
+    if logged_in is False:
+        return False
+    apply_session_cookies(driver, session.get("cookies", []), JOBRIGHT_BASE_URL)
+    driver.execute_script(
+        "for (const [key, value] of Object.entries(arguments[0])) { window.localStorage.setItem(key, value); }",
+        session.get("local_storage", {}),
+    )
+    if logged_in:
+        return True
+    try:
+        driver.get(SESSION_CHECK_URL)
+        wait_for(driver, element_present(LOGGED_IN_SELECTOR), "session_check", timeout=check_timeout)
+        return True
+    except TimeoutException:
+        return False
+
+def login_with_saved_session(driver, username, password, session_file):
+    """
+    Reuses the session saved by an earlier run when it is still valid and only
+    falls back to the full login flow (saving the new session) when it has expired.
+    The session file is encrypted with a key derived from the Jobright password.
+    """
+    session = load_session(session_file, password)
+    if session:
+        print("Restoring saved Jobright session...")
+        try:
+            if restore_session(driver, session):
+                print("Saved session is still valid. Skipping login.")
+                return True
+        except Exception as e:
+            print(f"Error restoring saved Jobright session: {e}")
+        print("Saved session has expired. Logging in again...")
+
+    if not login_to_jobright(driver, username, password):
+        return False
+    save_session(driver, session_file, password)
+    return True
@@ -2,6 +2,14 @@
 import gspread
 from google.oauth2.service_account import Credentials
 import datetime
+import json
+import os
+import random
+import threading
+import time
+
+import metrics
+from job_index import normalize_job_key
 
 def setup_sheets_client(service_account_file):
     """Authenticates and returns a gspread client."""
@@ -20,55 +28,230 @@ def setup_sheets_client(service_account_file):
         print(f"Error setting up Google Sheets client: {e}")
         raise
 
-def get_existing_jobs(client,sheet_id):
+def _load_jobs_snapshot(snapshot_file, sheet_id):
+    if not snapshot_file or not os.path.exists(snapshot_file):
+        return None
+    try:
+        with open(snapshot_file, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        return snapshot if snapshot.get("sheet_id") == sheet_id else None
+    except Exception as e:
+        print(f"Ignoring unreadable existing-jobs snapshot {snapshot_file}: {e}")
+        return None
+
+def _save_jobs_snapshot(snapshot_file, snapshot):
+    try:
+        directory = os.path.dirname(snapshot_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_file = snapshot_file + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f)
+        os.replace(temp_file, snapshot_file)
+    except Exception as e:
+        print(f"Error saving existing-jobs snapshot: {e}")
+
+def get_existing_jobs(client, sheet_id, snapshot_file=None):
     """
-    Returns a set of (company_name, role_title) tuples for fast lookup.
+    Returns a set of normalized (company_name, role_title) tuples for fast lookup.
+    Only the two key columns are read. With a snapshot file, the index and the
+    number of rows already synced are kept locally, so later calls only read
+    the rows appended since then (the last synced row is re-read to detect
+    edits/deletions, which trigger a full resync).
     """
     sheet = client.open_by_key(sheet_id).sheet1
-    existing_rows = sheet.get_all_values()[1:]  # Skip header row
-    return set((row[0].strip(), row[1].strip()) for row in existing_rows if len(row) >= 2)
+    snapshot = _load_jobs_snapshot(snapshot_file, sheet_id)
+
+    existing_jobs = None
+    if snapshot and snapshot.get("row_count"):
+        synced_rows = snapshot["row_count"]
+        with metrics.timed("sheets_read"):
+            rows = list(sheet.get(f"A{synced_rows}:B"))
+        if rows and rows[0] == snapshot.get("last_row"):
+            new_rows = rows[1:]
+            existing_jobs = set(tuple(key) for key in snapshot.get("keys", []))
+            existing_jobs.update(normalize_job_key(row[0], row[1]) for row in new_rows if len(row) >= 2)
+            row_count = synced_rows + len(new_rows)
+            last_row = rows[-1]
+            print(f"Existing jobs index: {len(new_rows)} new rows since last run.")
+        else:
+            print("Sheet changed above the last synced row. Rebuilding existing jobs index...")
+
+    if existing_jobs is None:
+        with metrics.timed("sheets_read"):
+            rows = list(sheet.get("A1:B")) # Header + key columns only
+        existing_jobs = set(normalize_job_key(row[0], row[1]) for row in rows[1:] if len(row) >= 2)  # Skip header row
+        row_count = len(rows)
+        last_row = rows[-1] if rows else []
+
+    if snapshot_file:
+        _save_jobs_snapshot(snapshot_file, {
+            "sheet_id": sheet_id,
+            "row_count": row_count,
+            "last_row": last_row,
+            "keys": sorted(existing_jobs),
+        })
+    return existing_jobs
+
+class SheetWriter:
+    """
+    Keeps the worksheet handle open and appends buffered rows in one API call
+    once `max_rows` rows are waiting or the oldest row is `max_age_seconds` old
+    (checked by a background timer too, so rows do not wait on the next append).
+    Quota/server errors are retried with exponential backoff; rows that still
+    cannot be written at close() are saved to `pending_file` and re-sent on the
+    next run, so none are lost. `on_written(items)` is called with the items
+    passed to append() once their rows are actually in the sheet.
+    """
+
+    RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(self, client, sheet_id, max_rows=20, max_age_seconds=30, max_retries=5, base_delay=2,
+                 pending_file=None, on_written=None):
+        self.sheet = client.open_by_key(sheet_id).sheet1 # Assumes logging to the first sheet
+        self.max_rows = max_rows
+        self.max_age_seconds = max_age_seconds
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.pending_file = pending_file
+        self.on_written = on_written
+        self._rows = []
+        self._items = [] # append() items, parallel to _rows
+        self._oldest_row_time = None
+        self._pending_file_loaded = False
+        self._lock = threading.RLock()
+        self._load_pending_rows()
+        self._closed = threading.Event()
+        self._timer = threading.Thread(target=self._flush_stale_rows, name="sheet-writer", daemon=True)
+        self._timer.start()
 
-def log_job_info(client, existing_jobs_set, sheet_id, company_name, role_title, role_desc, job_url):
+    def _load_pending_rows(self):
+        if not self.pending_file or not os.path.exists(self.pending_file):
+            return
+        try:
+            with open(self.pending_file, 'r', encoding='utf-8') as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+            # The file is only removed once these rows have been written
+            self._pending_file_loaded = True
+            if rows:
+                print(f"Re-queuing {len(rows)} rows left unsent by a previous run.")
+                self._rows.extend(rows)
+                self._items.extend([None] * len(rows))
+                self._oldest_row_time = time.monotonic()
+        except Exception as e:
+            print(f"Error loading unsent sheet rows from {self.pending_file}: {e}")
 
-    job_key = (company_name.strip(), role_title.strip())
+    def queued_rows(self):
+        """Returns the rows not written yet (including those re-queued from the last run)."""
+        with self._lock:
+            return list(self._rows)
+
+    def _flush_stale_rows(self):
+        check_interval = max(0.5, self.max_age_seconds / 4)
+        while not self._closed.wait(check_interval):
+            with self._lock:
+                if self._rows and time.monotonic() - self._oldest_row_time >= self.max_age_seconds:
+                    self.flush()
+
+    def append(self, row, item=None):
+        """Queues a row, flushing when the size or age threshold is reached."""
+        with self._lock:
+            if not self._rows:
+                self._oldest_row_time = time.monotonic()
+            self._rows.append(row)
+            self._items.append(item)
+            if (len(self._rows) >= self.max_rows
+                    or time.monotonic() - self._oldest_row_time >= self.max_age_seconds):
+                self.flush()
+
+    def _rows_written(self, count):
+        items = self._items[:count]
+        del self._rows[:count]
+        del self._items[:count]
+        self._oldest_row_time = time.monotonic() if self._rows else None
+        if self._pending_file_loaded:
+            self._pending_file_loaded = False
+            try:
+                os.remove(self.pending_file)
+            except OSError as e:
+                print(f"Error removing {self.pending_file}: {e}")
+        if self.on_written:
+            try:
+                self.on_written([item for item in items if item is not None])
+            except Exception as e:
+                print(f"Error in sheet write callback: {e}")
+
+    def flush(self):
+        """Writes all buffered rows with a single append_rows call. Returns True on success."""
+        with self._lock:
+            if not self._rows:
+                return True
+            rows = list(self._rows)
+            for attempt in range(self.max_retries):
+                try:
+                    with metrics.timed("sheets_write"):
+                        self.sheet.append_rows(rows)
+                    metrics.incr("sheets_rows_written", len(rows))
+                    print(f"Wrote {len(rows)} rows to Google Sheet.")
+                    self._rows_written(len(rows))
+                    return True
+                except gspread.exceptions.APIError as e:
+                    response = getattr(e, "response", None)
+                    status = response.status_code if response is not None else None
+                    if status not in self.RETRYABLE_STATUS or attempt == self.max_retries - 1:
+                        print(f"Google Sheets API Error: {e}")
+                        print("Check if the Sheet ID is correct and the service account has edit permissions.")
+                        return False
+                    metrics.incr("sheets_retries")
+                    delay = self.base_delay * (2 ** attempt) + random.uniform(0, 1)
+                    print(f"Google Sheets quota/server error ({status}). Retrying in {delay:.1f} seconds...")
+                    time.sleep(delay)
+                except Exception as e:
+                    print(f"Error writing rows to Google Sheet: {e}")
+                    return False
+            return False
+
+    def close(self):
+        """Flushes remaining rows; anything that still fails is saved for the next run."""
+        self._closed.set()
+        with self._lock:
+            if self.flush() or not self.pending_file:
+                return
+            try:
+                directory = os.path.dirname(self.pending_file)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # Rewritten, not appended: the unsent rows include any re-queued from the file
+                with open(self.pending_file, 'w', encoding='utf-8') as f:
+                    for row in self._rows:
+                        f.write(json.dumps(row) + "\n")
+                print(f"Saved {len(self._rows)} unsent rows to {self.pending_file}; they will be sent next run.")
+                self._rows = []
+                self._items = []
+                self._pending_file_loaded = False
+            except Exception as e:
+                print(f"Error saving unsent sheet rows: {e}")
+
+def log_job_info(writer, existing_jobs_set, company_name, role_title, role_desc, job_url, item=None):
+    """
+    Queues job details on the SheetWriter unless the job is already in the sheet.
+    `item` is handed to the writer's on_written callback once the row is written.
+    """
+    job_key = normalize_job_key(company_name, role_title)
 
     if job_key in existing_jobs_set:
         print(f"Skipping duplicate: {role_title} at {company_name}")
         return False
-    
-    try:
-        sheet = client.open_by_key(sheet_id).sheet1 # Assumes logging to the first sheet
-        row_to_insert = [company_name, role_title, role_desc, job_url]
-
-        sheet.append_row(row_to_insert)
-        existing_jobs_set.add(job_key)
-        print(f"Successfully logged Job Information for {role_title} at {company_name} to Google Sheet.")
-        return True
-    except gspread.exceptions.APIError as e:
-        print(f"Google Sheets API Error: {e}")
-        print("Check if the Sheet ID is correct and the service account has edit permissions.")
-        return False
-    except Exception as e:
-        print(f"Error logging to Google Sheet: {e}")
-        return False
 
+    writer.append([company_name, role_title, role_desc, job_url], item=item)
+    existing_jobs_set.add(job_key)
+    print(f"Queued Job Information for {role_title} at {company_name} for Google Sheet.")
+    return True
 
 
-def log_application(client, sheet_id, company_name, role_title):
-    """Appends application details to the specified Google Sheet."""
-    try:
-        sheet = client.open_by_key(sheet_id).sheet1 # Assumes logging to the first sheet
-        
-        date_applied = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        row_to_insert = [company_name, role_title, date_applied]
-        
-        sheet.append_row(row_to_insert)
-        print(f"Successfully logged application for {role_title} at {company_name} to Google Sheet.")
-        return True
-    except gspread.exceptions.APIError as e:
-        print(f"Google Sheets API Error: {e}")
-        print("Check if the Sheet ID is correct and the service account has edit permissions.")
-        return False
-    except Exception as e:
-        print(f"Error logging to Google Sheet: {e}")
-        return False
\ No newline at end of file
+def log_application(writer, company_name, role_title):
+    """Queues application details on the SheetWriter."""
+    date_applied = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    writer.append([company_name, role_title, date_applied])
+    print(f"Queued application for {role_title} at {company_name} for Google Sheet.")
+    return True
@@ -1,29 +1,89 @@
 import time
 import os # Add os import if not already there
+import requests
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException # Import exceptions
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException # Import exceptions
+from adaptive_wait import wait_for, element_present, element_with_text, element_clickable
+from html_parsing import make_job, parse_job_cards, parse_job_description
+import metrics
 
+JOBRIGHT_BASE_URL = "https://jobright.ai"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 
-def setup_driver():
-    """Sets up the Selenium WebDriver."""
+# Blocked in scraping sessions: nothing we parse needs images, fonts, media or analytics
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.mp3", "*.m3u8",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*hotjar.com*",
+    "*segment.io*", "*mixpanel.com*", "*clarity.ms*", "*facebook.net*",
+]
+
+def _get_driver_path(driver_path_cache, refresh=False):
+    """Returns the chromedriver path, reusing the one cached from an earlier run when it still exists."""
+    if driver_path_cache and not refresh and os.path.exists(driver_path_cache):
+        with open(driver_path_cache, 'r', encoding='utf-8') as f:
+            cached_path = f.read().strip()
+        if cached_path and os.path.exists(cached_path):
+            return cached_path
+
+    driver_path = ChromeDriverManager().install() # Version check / download
+    if driver_path_cache:
+        directory = os.path.dirname(driver_path_cache)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(driver_path_cache, 'w', encoding='utf-8') as f:
+            f.write(driver_path)
+    return driver_path
+
+def setup_driver(headless=False, block_resources=False, driver_path_cache=None):
+    """
+    Sets up the Selenium WebDriver. The scraping profile (headless=True,
+    block_resources=True) skips images, fonts, media and analytics and returns
+    from page loads once the DOM is ready. With driver_path_cache, the
+    chromedriver version check only runs when the cached binary is missing or
+    no longer starts.
+    """
     options = webdriver.ChromeOptions()
-    # options.add_argument("--headless") # Run in background without opening window
+    if headless:
+        options.add_argument("--headless=new") # Run in background without opening window
+        options.add_argument("--window-size=1920,1080") # Headless windows are tiny by default
     options.add_argument("--disable-gpu")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36") # Mimic real browser
-    
+    options.add_argument(f"user-agent={USER_AGENT}") # Mimic real browser
+    if block_resources:
+        options.page_load_strategy = "eager" # Don't wait for subresources; adaptive waits check readiness
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--mute-audio")
+        options.add_argument("--disable-extensions")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
     # Use webdriver-manager to automatically handle driver download/update
+    start = time.perf_counter()
     try:
-        service = ChromeService(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.implicitly_wait(10) # Implicit wait for elements
+        try:
+            service = ChromeService(_get_driver_path(driver_path_cache))
+            driver = webdriver.Chrome(service=service, options=options)
+        except Exception as e:
+            if not driver_path_cache:
+                raise
+            # The cached driver may no longer match the installed Chrome
+            print(f"Cached ChromeDriver failed to start ({e}). Re-checking driver version...")
+            service = ChromeService(_get_driver_path(driver_path_cache, refresh=True))
+            driver = webdriver.Chrome(service=service, options=options)
+
+        if block_resources:
+            try:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+            except Exception as e:
+                print(f"Warning: Could not enable resource blocking: {e}")
+        # No implicit wait: every lookup would stall while polling for readiness; see adaptive_wait.wait_for
+        metrics.record_time("setup_driver", time.perf_counter() - start)
         return driver
     except Exception as e:
         print(f"Error setting up WebDriver: {e}")
@@ -33,6 +93,7 @@ def setup_driver():
 def login_to_jobright(driver, username, password, login_url="https://jobright.ai/?login=true"): # Adjust URL if needed!
     """Logs into Jobright.ai."""
     print(f"Attempting to log into Jobright.ai at: {login_url}")
+    start = time.perf_counter()
     try:
         driver.get(login_url)
 
@@ -45,28 +106,21 @@ def login_to_jobright(driver, username, password, login_url="https://jobright.ai
         # It's better to use more specific IDs or names if available, e.g., "#email-input", "button[name='login']"
 
         # Wait for the email field to be present
-        email_field = WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, email_selector))
-        )
+        email_field = wait_for(driver, element_present(email_selector), "login_form")
         password_field = driver.find_element(By.CSS_SELECTOR, password_selector)
-        time.sleep(1)
-        login_button = driver.find_element(By.CSS_SELECTOR, login_button_selector)
-         # Let the scroll settle
 
         print("Entering credentials...")
         email_field.send_keys(username)
-        time.sleep(0.5) # Small delay
         password_field.send_keys(password)
-        time.sleep(1)
+        login_button = wait_for(driver, element_clickable(login_button_selector), "login_button")
         print("Clicking login button...")
         login_button.click()
 
         # --- Verification: Wait for an element that appears *after* login ---
         # Example: Wait for a dashboard element or user profile link. Adjust selector!
         post_login_indicator_selector = "div[class*='index_jobs-page']" # GUESS - Find a reliable element on the post-login page
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, post_login_indicator_selector))
-        )
+        wait_for(driver, element_present(post_login_indicator_selector), "login_complete")
+        metrics.record_time("login", time.perf_counter() - start)
         print("Login appears successful.")
         return True
 
@@ -83,30 +137,149 @@ def login_to_jobright(driver, username, password, login_url="https://jobright.ai
         return False
     
 
-def scroll_to_bottom(driver, container_selector, pause_time=2, max_scrolls=20):
-    """Scrolls inside a specific scrollable container until no more new content loads"""
-    container = WebDriverWait(driver, 10).until(
-        EC.presence_of_element_located((By.CSS_SELECTOR, container_selector))
-    )
-    
-    last_height = driver.execute_script(
-        "return arguments[0].scrollHeight", container
-    )
+def job_id_from_url(job_url):
+    """Returns the Jobright job id at the end of a job detail URL."""
+    return job_url.rstrip("/").rsplit("/", 1)[-1] if job_url else None
 
+def export_session_cookies(driver):
+    """Returns the cookies of a logged-in driver so other sessions can reuse the login."""
+    try:
+        return driver.get_cookies()
+    except Exception as e:
+        print(f"Error exporting session cookies: {e}")
+        return []
+
+def apply_session_cookies(driver, cookies, base_url=JOBRIGHT_BASE_URL):
+    """Loads cookies exported from a logged-in session into another driver."""
+    try:
+        driver.get(base_url) # Cookies can only be added for the domain currently loaded
+        for cookie in cookies:
+            cookie = dict(cookie)
+            if "expiry" in cookie:
+                cookie["expiry"] = int(cookie["expiry"]) # Chrome rejects float expiry values
+            try:
+                driver.add_cookie(cookie)
+            except Exception as e:
+                print(f"  - Could not restore cookie {cookie.get('name')}: {e}")
+        return True
+    except Exception as e:
+        print(f"Error applying session cookies: {e}")
+        return False
+
+
+# Runs in the browser: returns the cards not extracted yet and marks them, so each
+# call only touches newly loaded nodes. Selectors match parse_job_cards().
+EXTRACT_NEW_CARDS_JS = """
+const cards = document.querySelectorAll("div[class*='index_job-card']:not([data-scraped])");
+const found = [];
+for (const card of cards) {
+    card.setAttribute("data-scraped", "1");
+    if (!card.id) continue;
+    const text = (selector) => {
+        const element = card.querySelector(selector);
+        return element ? element.textContent.trim() : null;
+    };
+    found.push({
+        id: card.id,
+        title: text("h2[class*='index_job-title']"),
+        company: text("div[class*='index_company-name']"),
+        location: text("div[class*='index_job-metadata-item'] span"),
+    });
+}
+return found;
+"""
+COUNT_NEW_CARDS_JS = """
+return [document.querySelectorAll("div[class*='index_job-card']:not([data-scraped])").length,
+        arguments[0].scrollHeight];
+"""
+
+def iter_new_job_cards(driver, container_selector, max_wait=5, poll_interval=0.2, max_scrolls=20):
+    """
+    Scrolls the results container and yields lists of newly loaded jobs. Cards are
+    extracted in the browser, only from nodes not seen before, and each scroll
+    waits just until new cards (or more scroll height) appear, up to `max_wait`.
+    """
+    container = wait_for(driver, element_present(container_selector), "listing_container", max_timeout=10)
+    seen_ids = set()
+
+    def extract():
+        try:
+            with metrics.timed("extract_cards"):
+                new_cards = driver.execute_script(EXTRACT_NEW_CARDS_JS) or []
+        except WebDriverException as e:
+            print(f"In-browser card extraction failed ({e}). Parsing the page source instead.")
+            page_source = driver.page_source
+            metrics.incr("bytes_fetched", len(page_source.encode("utf-8")))
+            return parse_job_cards(page_source, seen_ids)
+        jobs = []
+        for card in new_cards:
+            if card["id"] in seen_ids:
+                continue # Re-rendered card
+            seen_ids.add(card["id"])
+            if card.get("title") and card.get("company"):
+                jobs.append(make_job(card["id"], card["title"], card["company"], card.get("location")))
+            else:
+                print("  - Skipping card, missing required elements (title, company, or link).")
+        return jobs
+
+    yield extract()
     for i in range(max_scrolls):
-        driver.execute_script(
-            "arguments[0].scrollTo(0, arguments[0].scrollHeight);", container
-        )
-        time.sleep(pause_time)
-        
-        new_height = driver.execute_script(
-            "return arguments[0].scrollHeight", container
-        )
-        if new_height == last_height:
+        last_height = driver.execute_script("return arguments[0].scrollHeight", container)
+        driver.execute_script("arguments[0].scrollTo(0, arguments[0].scrollHeight);", container)
+
+        def content_loaded(d):
+            new_cards, height = d.execute_script(COUNT_NEW_CARDS_JS, container)
+            return new_cards > 0 or height != last_height
+
+        metrics.incr("scrolls")
+        try:
+            with metrics.timed("scroll"):
+                # Never below 3s: a lazy load slower than the timeout ends the crawl of this search
+                wait_for(driver, content_loaded, "listing_scroll", poll_interval=poll_interval,
+                         min_timeout=min(3, max_wait), max_timeout=max_wait)
+        except TimeoutException:
+            yield extract() # Pick up anything that rendered without changing the height
             print("Reached end of scrollable container.")
             break
-        last_height = new_height
+        yield extract()
+
+def iter_jobright_listings(driver, search_url, known_ids=None, known_batches_to_stop=2):
+    """
+    Yields job listings from Jobright.ai search results (the driver must already be
+    logged in). New cards are yielded after every scroll instead of after the
+    whole list has loaded. With `known_ids` (job ids seen by an earlier run),
+    scrolling stops once `known_batches_to_stop` scrolls in a row load only known
+    cards; the cards shown before the first scroll never stop it.
+    """
+    print(f"\nNavigating to Jobright.ai search: {search_url}")
+    try:
+        driver.get(search_url)
+        # IMPORTANT: Inspect Jobright.ai's actual search results page
+        # These selectors are GUESSES and WILL likely need adjustment
+        wait_for(driver, element_present("div[class*='index_jobs-list-container']"), "listing_page") # Adjust selector #div.index_jobs-list-container__DVqkj
+        # Dynamic content has loaded once the first job card shows up
+        wait_for(driver, element_present("div[class*='index_job-card']"), "listing_cards")
 
+        scrolling_container_selector = "#scrollableDiv"
+        found_count = 0
+        known_batches = 0
+        for batch_number, new_jobs in enumerate(iter_new_job_cards(driver, scrolling_container_selector)):
+            found_count += len(new_jobs)
+            metrics.incr("jobs_listed", len(new_jobs))
+            for job in new_jobs:
+                yield job
+            if known_ids is None or batch_number == 0 or not new_jobs:
+                continue # The initial cards may be seen ones pinned above new listings
+            known_batches = known_batches + 1 if all(job["job_id"] in known_ids for job in new_jobs) else 0
+            if known_batches >= known_batches_to_stop:
+                print("Reached listings already seen by an earlier run. Stopping scroll.")
+                break
+        print(f"Found {found_count} job listings.")
+
+    except TimeoutException:
+         print(f"Error: Timed out waiting for job listings elements on {search_url}")
+    except Exception as e:
+        print(f"Error scraping job listings from {search_url}: {e}")
 
 def scrape_jobright_listings(driver, username, password, search_url):
     """Logs in and then scrapes job listings from Jobright.ai search results."""
@@ -117,120 +290,69 @@ def scrape_jobright_listings(driver, username, password, search_url):
         print("Login failed. Cannot proceed to scrape job listings.")
         return [] # Return empty list as scraping cannot happen
 
-
     # --- Step 2: Proceed to Scrape (if login was successful) ---
-    print(f"\nLogin successful. Navigating to Jobright.ai search: {search_url}")
-    try:
-        driver.get(search_url)
-        # Rest of the scraping logic remains the same...
-        # IMPORTANT: Inspect Jobright.ai's actual search results page
-        # These selectors are GUESSES and WILL likely need adjustment
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div[class*='index_jobs-list-container']")) # Adjust selector #div.index_jobs-list-container__DVqkj
-        )
-        time.sleep(3) # Allow dynamic content to load
-
-        scrolling_container_selector = "#scrollableDiv"
-        scroll_to_bottom(driver, scrolling_container_selector)
-    
-
-        time.sleep(3) 
-
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
+    return list(iter_jobright_listings(driver, search_url))
 
-        # Adjust these selectors based on actual Jobright structure
-        job_cards = soup.select("div[class*='index_job-card']") # Adjust selector #"div.index_job-card__AsPKC"
-        print(f"Found {len(job_cards)} potential job listings.")
+def create_http_session(cookies):
+    """Creates a requests.Session carrying the cookies exported from a logged-in driver."""
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    for cookie in cookies or []:
+        session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+    return session
 
-        jobs = []
-        seen_ids = set()
-        for card in job_cards:
-            try:
-                job_id = card.get("id")
-                if not job_id or job_id in seen_ids:
-                    continue
-                seen_ids.add(job_id)
-                print('job_id:', job_id)
-                title_element = card.select_one("h2[class*='index_job-title']") # Adjust selector #"h2.index_job-title__UjuEY"
-                company_element = card.select_one("div[class*='index_company-name']") # Adjust selector #"div.index_company-name__gKiOY"
-                location_element = card.select_one("div[class*='index_job-metadata-item'] span") # Adjust selector #"div.index_job-metadata-item__ThMv4 span"
-                #link_element = card.select_one("id") # Often the title is the link
-                
-                print('title_element:', title_element)
-                print('company_element:',company_element)
-                print('location_element:', location_element)
-                
-                if title_element and company_element and job_id:
-                    title = title_element.get_text(strip=True)
-                    company = company_element.get_text(strip=True)
-                    location = location_element.get_text(strip=True) if location_element else "N/A"
-                    # Construct absolute URL if relative
-                    #job_url = link_element.get('id')
-                    # if job_url and not job_url.startswith('http'):
-                       # Need Jobright.ai's base URL if links are relative
-                       #base_url = "https://jobright.ai/jobs/info/" # Adjust if needed
-                    job_url = f"https://jobright.ai/jobs/info/{job_id}"
-
-                    print(f"  - Found: {title} at {company}")
-                    jobs.append({
-                        "title": title,
-                        "company": company,
-                        "location": location,
-                        "url": job_url, # This might be the link to apply OR a details page on Jobright
-                        "description": None # Will fetch description later
-                    })
-                else:
-                    print("  - Skipping card, missing required elements (title, company, or link).")
-            except Exception as e:
-                print(f"  - Error parsing a job card: {e}")
-        return jobs
-
-    except TimeoutException:
-         print(f"Error: Timed out waiting for job listings elements on {search_url}")
-         return []
+def fetch_job_description_http(session, job_url, timeout=10):
+    """
+    Fast path: fetches the job detail page without a browser.
+    Returns the description, or None if the server HTML did not contain it.
+    """
+    if not job_url:
+        return None
+    try:
+        with metrics.timed("fetch_description_http"):
+            response = session.get(job_url, timeout=timeout)
+        metrics.incr("bytes_fetched", len(response.content))
+        if response.status_code != 200:
+            print(f"HTTP fast path got status {response.status_code} for {job_url}")
+            return None
+        full_description = parse_job_description(response.text, job_id_from_url(job_url))
+        metrics.incr("http_fast_path_hits" if full_description else "http_fast_path_misses")
+        return full_description or None
     except Exception as e:
-        print(f"Error scraping job listings from {search_url} after login: {e}")
-        return []
+        print(f"HTTP fast path failed for {job_url}: {e}")
+        return None
 
-def get_job_description(driver, job_url):
-    """Navigates to the job detail page and extracts responsibilities and skills sections."""
+def get_job_description(driver, job_url, cache=None):
+    """
+    Navigates to the job detail page and extracts responsibilities and skills sections.
+    If a DescriptionCache is given, a fresh cached copy is returned without loading the page.
+    """
     if not job_url:
         print("Error: No URL provided for job description.")
         return "Description not found."
 
+    job_id = job_id_from_url(job_url)
+    if cache:
+        cached_description = cache.get(job_id)
+        if cached_description:
+            print(f"Using cached job description for: {job_url}")
+            return cached_description
+
     print(f"Fetching job description from: {job_url}")
     try:
-        driver.get(job_url)
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "section[class*='index_sectionContent']")) #"section.index_sectionContent__zTR73"
-        )
-        time.sleep(2)
-
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-
-        # --- Responsibilities ---
-        # Select all matching sections and take the one WITHOUT an id (responsibilities)
-        responsibility_section = None
-        for section in soup.select("section[class*='index_sectionContent']"): #"section.index_sectionContent__zTR73"
-            if not section.has_attr("id"):  # The responsibilities section has no ID
-                responsibility_section = section
-                break
-
-        responsibilities = responsibility_section.get_text(separator='\n', strip=True) if responsibility_section else ""
-
-        # --- Skills (Required + Preferred) ---
-        skills_section = soup.select_one("section#skills-section")
-        skills = skills_section.get_text(separator='\n', strip=True) if skills_section else ""
+        with metrics.timed("fetch_description_browser"):
+            driver.get(job_url)
+            # Ready once a description section has rendered text
+            wait_for(driver, element_with_text("section[class*='index_sectionContent']"), "job_detail") #"section.index_sectionContent__zTR73"
+            page_source = driver.page_source
+        metrics.incr("bytes_fetched", len(page_source.encode("utf-8")))
 
-        # --- Combine All ---
-        full_description = "\n\n".join(filter(None, [
-            "Responsibilities:\n" + responsibilities if responsibilities else None,
-            "Skills & Qualifications:\n" + skills if skills else None
-        ]))
+        full_description = parse_job_description(page_source, job_id)
         print('full_description:', full_description)
+        if cache and full_description:
+            cache.put(job_id, full_description)
         return full_description if full_description else "No description found."
 
     except Exception as e:
         print(f"Error fetching job description from {job_url}: {e}")
-        return f"Error fetching description: {e}"
\ No newline at end of file
+        return f"Error fetching description: {e}"